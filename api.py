@@ -1,11 +1,11 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import jwt
 from datetime import datetime, timedelta
 from database import Database
 from bot_config import bot
-import hashlib
 import logging
 
 app = FastAPI(title="Copy Trading Bot API", version="1.0.0")
@@ -19,6 +19,12 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Database instance
 db = Database()
 
+@app.on_event("startup")
+async def prepare_database():
+    """Build missing trade indexes and seed the admin login before serving requests"""
+    await run_in_threadpool(db.ensure_indexes)
+    await run_in_threadpool(db.ensure_admin)
+
 # Request models
 class LoginRequest(BaseModel):
     email: str
@@ -58,7 +64,8 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
 @app.post("/api/login", response_model=TokenResponse)
 async def login(request: LoginRequest):
     """Login endpoint"""
-    if db.authenticate_user(request.email, request.password):
+    # scrypt verification is deliberately slow; keep it off the event loop
+    if await run_in_threadpool(db.authenticate_user, request.email, request.password):
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
             data={"sub": request.email}, expires_delta=access_token_expires
@@ -17,6 +17,9 @@ logging.basicConfig(
     ]
 )
 
+# Server IP users whitelist on their exchange API keys, unless SERVER_IP overrides it
+DEFAULT_SERVER_IP = '208.77.246.15'
+
 class CopyTradingBot:
     def __init__(self):
         self.db = Database()
@@ -64,6 +67,10 @@ class CopyTradingBot:
             logging.error(f"Error validating credentials: {e}")
             return False
     
+    def get_server_ip(self):
+        """Public IP of this server, for users to whitelist on their exchange API keys"""
+        return os.getenv('SERVER_IP') or DEFAULT_SERVER_IP
+    
     def get_account_stats(self, account_id):
         """Get account statistics"""
         trades = self.db.get_account_trades(account_id)
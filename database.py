@@ -1,13 +1,219 @@
 import mysql.connector
 from mysql.connector import Error
 import os
+import hashlib
+import hmac
+import threading
 from dotenv import load_dotenv
 import logging
 from datetime import datetime
 
 load_dotenv()
 
+# Static SQL templates, hoisted out of the methods so each call reuses the same
+# module-level string instead of rebuilding a multi-line literal.
+
+_SQL_SELECT_USER_AUTH = "SELECT id, email, password, role, status FROM users WHERE email = %s"
+_SQL_UPDATE_USER_PASSWORD = "UPDATE users SET password = %s WHERE id = %s"
+_SQL_UPSERT_ADMIN = (
+    "INSERT INTO users (email, password, role, status, approved_at) "
+    "VALUES (%s, %s, 'admin', 'approved', NOW()) "
+    "ON DUPLICATE KEY UPDATE password = VALUES(password), role = 'admin', status = 'approved'"
+)
+_SQL_INSERT_USER = (
+    "INSERT INTO users (email, password, role, status) "
+    "VALUES (%s, %s, 'user', 'pending')"
+)
+_SQL_SELECT_PENDING_USERS = (
+    "SELECT id, email, created_at FROM users "
+    "WHERE status = 'pending' ORDER BY created_at ASC"
+)
+_SQL_APPROVE_USER = (
+    "UPDATE users SET status = 'approved', approved_by = %s, approved_at = NOW() "
+    "WHERE id = %s AND status = 'pending'"
+)
+_SQL_REJECT_USER = (
+    "UPDATE users SET status = 'rejected', approved_by = %s, approved_at = NOW() "
+    "WHERE id = %s AND status = 'pending'"
+)
+# Bulk form of the two statements above; {ids} is filled with one %s per user id
+_SQL_SET_PENDING_USERS_STATUS = (
+    "UPDATE users SET status = %s, approved_by = %s, approved_at = NOW() "
+    "WHERE status = 'pending' AND id IN ({ids})"
+)
+_SQL_SELECT_ALL_USERS = (
+    "SELECT u.id, u.email, u.role, u.status, u.created_at, "
+    "a.email as approved_by_email, u.approved_at "
+    "FROM users u LEFT JOIN users a ON u.approved_by = a.id "
+    "ORDER BY u.created_at DESC"
+)
+_SQL_SELECT_BINANCE_ACCOUNT_COLUMNS = (
+    "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS "
+    "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'binance_accounts'"
+)
+_SQL_INSERT_BINANCE_ACCOUNT = (
+    "INSERT INTO binance_accounts (user_email, exchange_type, api_key, secret_key, account_name) "
+    "VALUES (%s, %s, %s, %s, %s)"
+)
+_SQL_INSERT_BINANCE_ACCOUNT_LEGACY = (
+    "INSERT INTO binance_accounts (user_email, api_key, secret_key, account_name) "
+    "VALUES (%s, %s, %s, %s)"
+)
+_SQL_SELECT_USER_ACCOUNTS = "SELECT * FROM binance_accounts WHERE user_email = %s"
+_SQL_DELETE_ACCOUNT = "DELETE FROM binance_accounts WHERE id = %s AND user_email = %s"
+_SQL_SELECT_ALL_BINANCE_ACCOUNTS = (
+    "SELECT ba.*, u.email as user_email FROM binance_accounts ba "
+    "JOIN users u ON ba.user_email = u.email "
+    "ORDER BY ba.created_at DESC"
+)
+_SQL_UPDATE_BINANCE_ACCOUNT = (
+    "UPDATE binance_accounts SET api_key = %s, secret_key = %s, account_name = %s "
+    "WHERE id = %s"
+)
+_SQL_DELETE_ACCOUNT_ADMIN = "DELETE FROM binance_accounts WHERE id = %s"
+_SQL_SELECT_ACCOUNT_BY_ID = "SELECT * FROM binance_accounts WHERE id = %s AND user_email = %s"
+_SQL_SELECT_ACCOUNT_TRADES = (
+    "SELECT t.*, ba.account_name, ba.user_email FROM trades t "
+    "JOIN binance_accounts ba ON t.account_id = ba.id "
+    "WHERE t.account_id = %s ORDER BY t.trade_time DESC LIMIT 100"
+)
+# Latest 100 trades of every account, the same rows get_account_trades returns per account
+_SQL_SELECT_ALL_ACCOUNT_TRADES = (
+    "SELECT * FROM ("
+    "SELECT t.*, ba.account_name, ba.user_email, "
+    "ROW_NUMBER() OVER (PARTITION BY t.account_id ORDER BY t.trade_time DESC) AS _row "
+    "FROM trades t JOIN binance_accounts ba ON t.account_id = ba.id"
+    ") ranked WHERE _row <= 100 ORDER BY trade_time DESC"
+)
+# Changes whenever a trade is inserted or deleted (COUNT) or updated in place
+# (updated_at); answered from the (account_id, updated_at) index alone
+_SQL_SELECT_TRADES_ETAG = "SELECT COUNT(*), MAX(updated_at) FROM trades WHERE account_id = %s"
+_SQL_SELECT_ACCOUNT_TRADE_COUNTS = (
+    "SELECT side, status, COUNT(*) AS trades FROM trades "
+    "WHERE account_id = %s GROUP BY side, status"
+)
+_SQL_SELECT_DISTINCT_TRADE_SYMBOLS = "SELECT DISTINCT symbol FROM trades WHERE account_id = %s ORDER BY symbol"
+_SQL_SELECT_DISTINCT_TRADE_STATUSES = "SELECT DISTINCT status FROM trades WHERE account_id = %s ORDER BY status"
+# Indexes backing the trade history filters, paging and summary counts
+_SQL_CREATE_TRADE_INDEXES = (
+    "CREATE INDEX idx_trades_acct_time ON trades (account_id, trade_time)",
+    "CREATE INDEX idx_trades_acct_symbol_time ON trades (account_id, symbol, trade_time)",
+    "CREATE INDEX idx_trades_acct_status ON trades (account_id, status)",
+    "CREATE INDEX idx_trades_acct_updated ON trades (account_id, updated_at)",
+)
+# Row version for the trades etag; MySQL bumps it on every UPDATE that changes the row
+_SQL_ADD_TRADES_UPDATED_AT = (
+    "ALTER TABLE trades ADD COLUMN updated_at TIMESTAMP(6) NOT NULL "
+    "DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)"
+)
+# MySQL errors for ADD COLUMN / CREATE INDEX on a name that already exists
+_ER_DUP_FIELDNAME = 1060
+_ER_DUP_KEYNAME = 1061
+_SQL_INSERT_TRADE = (
+    "INSERT INTO trades (account_id, symbol, side, order_type, quantity, "
+    "price, stop_price, order_id, status, source_order_id, trade_time, start_balance) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), %s)"
+)
+_SQL_INCREMENT_TRADE_COUNT = (
+    "UPDATE binance_accounts SET total_trades = total_trades + 1 WHERE id = %s"
+)
+_SQL_COUNT_PHEMEX_TABLE = (
+    "SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES "
+    "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'phemex_accounts'"
+)
+_SQL_INSERT_PHEMEX_ACCOUNT = (
+    "INSERT INTO phemex_accounts (user_email, exchange_type, api_key, secret_key, account_name) "
+    "VALUES (%s, %s, %s, %s, %s)"
+)
+# phemex_accounts.total_trades is never incremented, so count the trades here
+_SQL_SELECT_ALL_PHEMEX_ACCOUNTS = (
+    "SELECT pa.id, pa.user_email, pa.exchange_type, pa.api_key, pa.secret_key, "
+    "pa.account_name, COALESCE(pt.trade_count, 0) AS total_trades, pa.created_at, "
+    "u.email as user_email_ref "
+    "FROM phemex_accounts pa LEFT JOIN users u ON pa.user_email = u.email "
+    "LEFT JOIN (SELECT account_id, COUNT(*) AS trade_count FROM phemex_trades "
+    "GROUP BY account_id) pt ON pt.account_id = pa.id "
+    "ORDER BY pa.created_at DESC"
+)
+_SQL_SELECT_USER_PHEMEX_ACCOUNTS = "SELECT * FROM phemex_accounts WHERE user_email = %s"
+_SQL_DELETE_PHEMEX_ACCOUNT = "DELETE FROM phemex_accounts WHERE id = %s AND user_email = %s"
+_SQL_SELECT_PHEMEX_ACCOUNT_BY_ID = (
+    "SELECT * FROM phemex_accounts WHERE id = %s AND user_email = %s"
+)
+_SQL_FIND_MATCHING_TRADE = (
+    "SELECT t.* FROM trades t "
+    "WHERE t.account_id = %s AND t.symbol = %s AND t.side = %s AND t.quantity = %s "
+    "AND t.status != 'CLOSED' ORDER BY t.trade_time DESC LIMIT 1"
+)
+_SQL_FIND_MATCHING_PHEMEX_TRADE = (
+    "SELECT pt.* FROM phemex_trades pt "
+    "WHERE pt.account_id = %s AND pt.symbol = %s AND pt.side = %s AND pt.quantity = %s "
+    "AND pt.status != 'CLOSED' ORDER BY pt.trade_time DESC LIMIT 1"
+)
+_SQL_UPDATE_TRADE_PNL = "UPDATE trades SET pnl = %s, end_balance = %s WHERE id = %s"
+_SQL_UPDATE_PHEMEX_TRADE_PNL = "UPDATE phemex_trades SET pnl = %s, end_balance = %s WHERE id = %s"
+_SQL_INSERT_PHEMEX_TRADE = (
+    "INSERT INTO phemex_trades (account_id, symbol, side, order_type, quantity, price, "
+    "stop_price, order_id, status, source_order_id, trade_time, start_balance) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+)
+
+# scrypt cost parameters for stored passwords; the defaults take ~16 MiB per
+# hash (128 * N * r bytes). Raise SCRYPT_N to make logins slower to brute-force,
+# existing hashes are upgraded on the next successful login
+_SCRYPT_N = int(os.getenv('SCRYPT_N', 2 ** 14))
+_SCRYPT_R = int(os.getenv('SCRYPT_R', 8))
+_SCRYPT_P = int(os.getenv('SCRYPT_P', 1))
+
+def _scrypt(password, salt, n, r, p, dklen):
+    # hashlib rejects anything above 32 MiB by default; allow what the parameters need
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, dklen=dklen,
+                          maxmem=256 * n * r + 1024 * 1024)
+
+def summarize_trade_counts(rows):
+    """Fold (side, status, trades) GROUP BY rows into the account summary counters"""
+    counts = {'total': 0, 'buy': 0, 'sell': 0, 'filled': 0, 'mirrored': 0}
+    for row in rows:
+        trades = row['trades']
+        counts['total'] += trades
+        if row['side'] == 'BUY':
+            counts['buy'] += trades
+        elif row['side'] == 'SELL':
+            counts['sell'] += trades
+        if row['status'] == 'FILLED':
+            counts['filled'] += trades
+        elif row['status'] == 'MIRRORED':
+            counts['mirrored'] += trades
+    return counts
+
+def hash_password(password):
+    """Hash a password with scrypt as a self-describing 'scrypt$n$r$p$salt$hash' string"""
+    salt = os.urandom(16)
+    digest = _scrypt(password, salt, _SCRYPT_N, _SCRYPT_R, _SCRYPT_P, 32)
+    return f"scrypt${_SCRYPT_N}${_SCRYPT_R}${_SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+def verify_password(password, stored):
+    """Check a password against a stored scrypt string or a legacy SHA-256 hex digest"""
+    if not stored:
+        return False
+    if stored.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, digest = stored.split("$")
+            candidate = _scrypt(password, bytes.fromhex(salt), int(n), int(r), int(p), len(digest) // 2)
+        except ValueError:
+            return False
+        return hmac.compare_digest(candidate.hex().encode(), digest.encode())
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str arguments
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest().encode(), stored.encode())
+
+def password_needs_rehash(stored):
+    """True when a stored hash is legacy SHA-256 or uses outdated scrypt parameters"""
+    return not stored.startswith(f"scrypt${_SCRYPT_N}${_SCRYPT_R}${_SCRYPT_P}$")
+
 class Database:
+    # binance_accounts column names, shared by all instances once probed
+    _binance_account_columns = None
+    
     def __init__(self):
         # Use Railway's MySQL environment variables with fallbacks
         self.host = os.getenv('MYSQLHOST', os.getenv('DB_HOST', 'localhost'))
@@ -15,11 +221,23 @@ class Database:
         self.user = os.getenv('MYSQLUSER', os.getenv('DB_USER', 'root'))
         self.password = os.getenv('MYSQLPASSWORD', os.getenv('DB_PASSWORD', ''))
         self.port = int(os.getenv('MYSQLPORT', os.getenv('DB_PORT', '3306')))
+        # Protocol compression for remote/managed MySQL (off by default for local dev)
+        self.compress = os.getenv('DB_COMPRESS', '0') == '1'
+        # Connections are per thread so one instance can be shared by Streamlit sessions
+        self._local = threading.local()
         self.connection = None
         
         # Log connection details (without password) for debugging
         #logging.info(f"Database config - Host: {self.host}, Database: {self.database}, User: {self.user}, Port: {self.port}")
         
+    @property
+    def connection(self):
+        return getattr(self._local, 'connection', None)
+    
+    @connection.setter
+    def connection(self, value):
+        self._local.connection = value
+    
     def connect(self):
         try:
             self.connection = mysql.connector.connect(
@@ -32,7 +250,8 @@ class Database:
                 collation='utf8mb4_unicode_ci',
                 autocommit=False,
                 connection_timeout=30,
-                auth_plugin='mysql_native_password'
+                auth_plugin='mysql_native_password',
+                compress=self.compress
             )
             if self.connection.is_connected():
                 #logging.info("Successfully connected to Railway MySQL database")
@@ -95,6 +314,7 @@ class Database:
             order_id BIGINT,
             status VARCHAR(50),
             trade_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
             FOREIGN KEY (account_id) REFERENCES binance_accounts(id)
         )
         """
@@ -104,41 +324,87 @@ class Database:
             cursor.execute(binance_accounts_table)
             cursor.execute(trades_table)
             self.connection.commit()
+            #logging.info("Database tables created successfully")
+        except Error as e:
+            logging.error(f"Error creating tables: {e}")
+            return False
+        finally:
+            cursor.close()
+            self.disconnect()
+        
+        return self.ensure_indexes() and self.ensure_admin()
+    
+    def ensure_indexes(self):
+        """Add the trades version column and history indexes that are missing; safe to run on every startup"""
+        if not self.connect():
+            return False
             
-            # Insert admin user from environment variables
-            admin_email = os.getenv('ADMIN_EMAIL', 'admin@test.com').strip('"')
-            admin_password = os.getenv('ADMIN_PASSWORD', 'admin123').strip('"')
+        cursor = self.connection.cursor()
+        
+        try:
+            try:
+                cursor.execute(_SQL_ADD_TRADES_UPDATED_AT)
+            except Error as e:
+                if e.errno != _ER_DUP_FIELDNAME:
+                    raise
+            # MySQL has no CREATE INDEX IF NOT EXISTS; skip indexes that are already there
+            for index_sql in _SQL_CREATE_TRADE_INDEXES:
+                try:
+                    cursor.execute(index_sql)
+                except Error as e:
+                    if e.errno != _ER_DUP_KEYNAME:
+                        raise
+            return True
+        except Error as e:
+            logging.error(f"Error preparing trades table: {e}")
+            return False
+        finally:
+            cursor.close()
+            self.disconnect()
+    
+    def ensure_admin(self):
+        """Insert or refresh the admin user from ADMIN_EMAIL/ADMIN_PASSWORD; run at startup"""
+        admin_email = os.getenv('ADMIN_EMAIL', '').strip('"')
+        admin_password = os.getenv('ADMIN_PASSWORD', '').strip('"')
+        if not admin_email or not admin_password:
+            # Never seed a default admin login on a deployment that did not configure one
+            return True
+        if not self.connect():
+            return False
             
-            admin_user_query = """
-            INSERT IGNORE INTO users (email, password, role, status, approved_at) 
-            VALUES (%s, %s, 'admin', 'approved', NOW())
-            """
-            cursor.execute(admin_user_query, (admin_email, admin_password))
+        cursor = self.connection.cursor()
+        
+        try:
+            cursor.execute(_SQL_UPSERT_ADMIN, (admin_email, hash_password(admin_password)))
             self.connection.commit()
-            
-            #logging.info("Database tables created successfully")
             return True
         except Error as e:
-            logging.error(f"Error creating tables: {e}")
+            logging.error(f"Error seeding admin user: {e}")
             return False
         finally:
             cursor.close()
             self.disconnect()
     
     def authenticate_user(self, email, password):
-        """Authenticate user and return user details"""
+        """Authenticate user with a plaintext password and return user details"""
         if not self.connect():
             return None
             
         cursor = self.connection.cursor(dictionary=True)
-        query = """
-        SELECT id, email, role, status FROM users 
-        WHERE email = %s AND password = %s
-        """
+        query = _SQL_SELECT_USER_AUTH
         
         try:
-            cursor.execute(query, (email, password))
+            cursor.execute(query, (email,))
             result = cursor.fetchone()
+            if not result or not verify_password(password, result['password']):
+                return None
+            
+            # Upgrade legacy SHA-256 rows to the current scrypt format on login
+            if password_needs_rehash(result['password']):
+                cursor.execute(_SQL_UPDATE_USER_PASSWORD, (hash_password(password), result['id']))
+                self.connection.commit()
+            
+            del result['password']
             return result
         except Error as e:
             logging.error(f"Error authenticating user: {e}")
@@ -153,10 +419,7 @@ class Database:
             return False
             
         cursor = self.connection.cursor()
-        query = """
-        INSERT INTO users (email, password, role, status)
-        VALUES (%s, %s, 'user', 'pending')
-        """
+        query = _SQL_INSERT_USER
         
         try:
             cursor.execute(query, (email, password))
@@ -176,11 +439,7 @@ class Database:
             return []
             
         cursor = self.connection.cursor(dictionary=True)
-        query = """
-        SELECT id, email, created_at FROM users 
-        WHERE status = 'pending' 
-        ORDER BY created_at ASC
-        """
+        query = _SQL_SELECT_PENDING_USERS
         
         try:
             cursor.execute(query)
@@ -199,11 +458,7 @@ class Database:
             return False
             
         cursor = self.connection.cursor()
-        query = """
-        UPDATE users 
-        SET status = 'approved', approved_by = %s, approved_at = NOW()
-        WHERE id = %s AND status = 'pending'
-        """
+        query = _SQL_APPROVE_USER
         
         try:
             cursor.execute(query, (admin_id, user_id))
@@ -222,11 +477,7 @@ class Database:
             return False
             
         cursor = self.connection.cursor()
-        query = """
-        UPDATE users 
-        SET status = 'rejected', approved_by = %s, approved_at = NOW()
-        WHERE id = %s AND status = 'pending'
-        """
+        query = _SQL_REJECT_USER
         
         try:
             cursor.execute(query, (admin_id, user_id))
@@ -239,19 +490,42 @@ class Database:
             cursor.close()
             self.disconnect()
     
+    def bulk_update_user_status(self, approve_ids, reject_ids, admin_id):
+        """Approve and reject several pending users in a single transaction"""
+        if not approve_ids and not reject_ids:
+            return 0
+        if not self.connect():
+            return False
+            
+        cursor = self.connection.cursor()
+        
+        try:
+            # One UPDATE ... WHERE id IN (...) per decision instead of one per user
+            self.connection.start_transaction()
+            updated = 0
+            for status, user_ids in (('approved', approve_ids), ('rejected', reject_ids)):
+                if user_ids:
+                    placeholders = ",".join(["%s"] * len(user_ids))
+                    query = _SQL_SET_PENDING_USERS_STATUS.format(ids=placeholders)
+                    cursor.execute(query, (status, admin_id, *user_ids))
+                    updated += cursor.rowcount
+            self.connection.commit()
+            return updated
+        except Error as e:
+            logging.error(f"Error updating user statuses: {e}")
+            self.connection.rollback()
+            return False
+        finally:
+            cursor.close()
+            self.disconnect()
+    
     def get_all_users(self):
         """Get all users (admin only)"""
         if not self.connect():
             return []
             
         cursor = self.connection.cursor(dictionary=True)
-        query = """
-        SELECT u.id, u.email, u.role, u.status, u.created_at,
-               a.email as approved_by_email, u.approved_at
-        FROM users u
-        LEFT JOIN users a ON u.approved_by = a.id
-        ORDER BY u.created_at DESC
-        """
+        query = _SQL_SELECT_ALL_USERS
         
         try:
             cursor.execute(query)
@@ -264,38 +538,70 @@ class Database:
             cursor.close()
             self.disconnect()
     
+    def get_admin_overview(self):
+        """Get all users, pending users and all Binance accounts over one connection"""
+        overview = {'all_users': [], 'pending_users': [], 'accounts': []}
+        if not self.connect():
+            return overview
+            
+        cursor = self.connection.cursor(dictionary=True)
+        
+        try:
+            cursor.execute(_SQL_SELECT_ALL_USERS)
+            overview['all_users'] = cursor.fetchall()
+            # Pending users are a subset of the rows above, oldest first like get_pending_users
+            overview['pending_users'] = [
+                {'id': user['id'], 'email': user['email'], 'created_at': user['created_at']}
+                for user in reversed(overview['all_users']) if user['status'] == 'pending'
+            ]
+            cursor.execute(_SQL_SELECT_ALL_BINANCE_ACCOUNTS)
+            overview['accounts'] = cursor.fetchall()
+            return overview
+        except Error as e:
+            logging.error(f"Error getting admin overview: {e}")
+            return overview
+        finally:
+            cursor.close()
+            self.disconnect()
+    
+    def get_binance_account_columns(self):
+        """Column names of binance_accounts, probed once per process"""
+        if Database._binance_account_columns is not None:
+            return Database._binance_account_columns
+        if not self.connect():
+            return frozenset()
+            
+        cursor = self.connection.cursor()
+        
+        try:
+            cursor.execute(_SQL_SELECT_BINANCE_ACCOUNT_COLUMNS, (self.database,))
+            columns = frozenset(row[0] for row in cursor.fetchall())
+            if columns:
+                Database._binance_account_columns = columns
+            return columns
+        except Error as e:
+            logging.error(f"Error reading binance_accounts columns: {e}")
+            return frozenset()
+        finally:
+            cursor.close()
+            self.disconnect()
+    
     def add_binance_account_with_exchange_type(self, user_email, api_key, secret_key, account_name=None, exchange_type='binance'):
         """Add a new trading account with exchange type support"""
+        # Older schemas lack exchange_type; the probe is cached after the first call
+        column_exists = 'exchange_type' in self.get_binance_account_columns()
         if not self.connect():
             return False
             
         cursor = self.connection.cursor()
         
-        # Check if exchange_type column exists, if not use old method
         try:
-            # First check if the column exists
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'binance_accounts' AND COLUMN_NAME = 'exchange_type'
-            """, (os.getenv('DB_NAME', 'railway'),))
-            
-            column_exists = cursor.fetchone()[0] > 0
-            
             if column_exists:
                 # Use new schema with exchange_type
-                query = """
-                INSERT INTO binance_accounts (user_email, exchange_type, api_key, secret_key, account_name)
-                VALUES (%s, %s, %s, %s, %s)
-                """
-                cursor.execute(query, (user_email, exchange_type, api_key, secret_key, account_name))
+                cursor.execute(_SQL_INSERT_BINANCE_ACCOUNT, (user_email, exchange_type, api_key, secret_key, account_name))
             else:
                 # Use old schema without exchange_type
-                query = """
-                INSERT INTO binance_accounts (user_email, api_key, secret_key, account_name)
-                VALUES (%s, %s, %s, %s)
-                """
-                cursor.execute(query, (user_email, api_key, secret_key, account_name))
+                cursor.execute(_SQL_INSERT_BINANCE_ACCOUNT_LEGACY, (user_email, api_key, secret_key, account_name))
             
             self.connection.commit()
             #logging.info(f"Account added for {user_email} on {exchange_type}")
@@ -318,7 +624,7 @@ class Database:
             return []
             
         cursor = self.connection.cursor(dictionary=True)
-        query = "SELECT * FROM binance_accounts WHERE user_email = %s"
+        query = _SQL_SELECT_USER_ACCOUNTS
         
         try:
             cursor.execute(query, (user_email,))
@@ -336,7 +642,7 @@ class Database:
             return False
             
         cursor = self.connection.cursor()
-        query = "DELETE FROM binance_accounts WHERE id = %s AND user_email = %s"
+        query = _SQL_DELETE_ACCOUNT
         
         try:
             cursor.execute(query, (account_id, user_email))
@@ -355,12 +661,7 @@ class Database:
             return []
             
         cursor = self.connection.cursor(dictionary=True)
-        query = """
-        SELECT ba.*, u.email as user_email 
-        FROM binance_accounts ba
-        JOIN users u ON ba.user_email = u.email
-        ORDER BY ba.created_at DESC
-        """
+        query = _SQL_SELECT_ALL_BINANCE_ACCOUNTS
         
         try:
             cursor.execute(query)
@@ -379,11 +680,7 @@ class Database:
             return False
             
         cursor = self.connection.cursor()
-        query = """
-        UPDATE binance_accounts 
-        SET api_key = %s, secret_key = %s, account_name = %s
-        WHERE id = %s
-        """
+        query = _SQL_UPDATE_BINANCE_ACCOUNT
         
         try:
             cursor.execute(query, (api_key, secret_key, account_name, account_id))
@@ -402,7 +699,7 @@ class Database:
             return False
             
         cursor = self.connection.cursor()
-        query = "DELETE FROM binance_accounts WHERE id = %s"
+        query = _SQL_DELETE_ACCOUNT_ADMIN
         
         try:
             cursor.execute(query, (account_id,))
@@ -421,10 +718,7 @@ class Database:
             return None
             
         cursor = self.connection.cursor(dictionary=True)
-        query = """
-        SELECT * FROM binance_accounts 
-        WHERE id = %s AND user_email = %s
-        """
+        query = _SQL_SELECT_ACCOUNT_BY_ID
         
         try:
             cursor.execute(query, (account_id, user_email))
@@ -436,21 +730,14 @@ class Database:
         finally:
             cursor.close()
             self.disconnect()
-    
+
     def get_account_trades(self, account_id):
         """Get trading history for a specific account"""
         if not self.connect():
             return []
             
         cursor = self.connection.cursor(dictionary=True)
-        query = """
-        SELECT t.*, ba.account_name, ba.user_email
-        FROM trades t
-        JOIN binance_accounts ba ON t.account_id = ba.id
-        WHERE t.account_id = %s
-        ORDER BY t.trade_time DESC
-        LIMIT 100
-        """
+        query = _SQL_SELECT_ACCOUNT_TRADES
         
         try:
             cursor.execute(query, (account_id,))
@@ -463,6 +750,115 @@ class Database:
             cursor.close()
             self.disconnect()
     
+    def get_all_account_trades(self):
+        """Get the trading history of every Binance account in one query"""
+        if not self.connect():
+            return []
+            
+        cursor = self.connection.cursor(dictionary=True)
+        
+        try:
+            cursor.execute(_SQL_SELECT_ALL_ACCOUNT_TRADES)
+            results = cursor.fetchall()
+            for row in results:
+                del row['_row']
+            return results
+        except Error as e:
+            logging.error(f"Error getting all account trades: {e}")
+            return []
+        finally:
+            cursor.close()
+            self.disconnect()
+    
+    def get_account_bundle(self, account_id, user_email):
+        """Account row, trade counts and filter values over one connection"""
+        if not self.connect():
+            return None
+            
+        cursor = self.connection.cursor(dictionary=True)
+        
+        try:
+            cursor.execute(_SQL_SELECT_ACCOUNT_BY_ID, (account_id, user_email))
+            info = cursor.fetchone()
+            if not info:
+                return None
+            
+            cursor.execute(_SQL_SELECT_ACCOUNT_TRADE_COUNTS, (account_id,))
+            counts = summarize_trade_counts(cursor.fetchall())
+            cursor.execute(_SQL_SELECT_DISTINCT_TRADE_SYMBOLS, (account_id,))
+            symbols = [row['symbol'] for row in cursor.fetchall()]
+            cursor.execute(_SQL_SELECT_DISTINCT_TRADE_STATUSES, (account_id,))
+            statuses = [row['status'] for row in cursor.fetchall()]
+            return {
+                'info': info,
+                'counts': counts,
+                'symbols': symbols,
+                'statuses': statuses,
+            }
+        except Error as e:
+            logging.error(f"Error getting account bundle: {e}")
+            return None
+        finally:
+            cursor.close()
+            self.disconnect()
+    
+    def get_trades_etag(self, account_id):
+        """Short version string for an account's trades, used as a cache key"""
+        if not self.connect():
+            return None
+            
+        cursor = self.connection.cursor()
+        
+        try:
+            cursor.execute(_SQL_SELECT_TRADES_ETAG, (account_id,))
+            return "-".join(str(value) for value in cursor.fetchone())
+        except Error as e:
+            logging.error(f"Error getting trades etag: {e}")
+            return None
+        finally:
+            cursor.close()
+            self.disconnect()
+    
+    def query_account_trades(self, account_id, symbol=None, side=None, status=None, limit=10, offset=0):
+        """One page of an account's trades matching the filters, newest first, plus the total match count"""
+        if not self.connect():
+            return [], 0
+        
+        conditions = ["account_id = %s"]
+        params = [account_id]
+        for column, value in (('symbol', symbol), ('side', side), ('status', status)):
+            if value is not None:
+                conditions.append(f"{column} = %s")
+                params.append(value)
+        where = " AND ".join(conditions)
+        
+        cursor = self.connection.cursor(dictionary=True)
+        
+        try:
+            # The window count is computed before LIMIT, so each row carries the full match count
+            cursor.execute(
+                f"SELECT *, COUNT(*) OVER () AS _total FROM trades WHERE {where} "
+                f"ORDER BY trade_time DESC LIMIT %s OFFSET %s",
+                params + [limit, offset]
+            )
+            rows = cursor.fetchall()
+            if rows:
+                total = rows[0]['_total']
+                for row in rows:
+                    del row['_total']
+                return rows, total
+            if not offset:
+                return [], 0
+            # Paged past the end: no row to read the count from
+            cursor.execute(f"SELECT COUNT(*) AS total FROM trades WHERE {where}", params)
+            return [], cursor.fetchone()['total']
+        except Error as e:
+            logging.error(f"Error querying account trades: {e}")
+            return [], 0
+        finally:
+            cursor.close()
+            self.disconnect()
+    
     def add_trade(self, account_id, symbol, side, order_type, quantity, 
                   price=None, stop_price=None, order_id=None, status='PENDING', source_order_id=None, start_balance=0):
         """Add a trade record to the database"""
@@ -470,31 +866,26 @@ class Database:
             return False
             
         cursor = self.connection.cursor()
-        query = """
-        INSERT INTO trades (account_id, symbol, side, order_type, quantity, 
-                           price, stop_price, order_id, status, source_order_id, trade_time, start_balance)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), %s)
-        """
+        query = _SQL_INSERT_TRADE
         
         try:
+            # Insert and counter update share one transaction (single commit)
+            self.connection.start_transaction()
             cursor.execute(query, (
                 account_id, symbol, side, order_type, quantity,
                 price, stop_price, order_id, status, source_order_id, start_balance
             ))
-            self.connection.commit()
-            
+            trade_id = cursor.lastrowid
+
             # Update account trade count
-            cursor.execute("""
-                UPDATE binance_accounts 
-                SET total_trades = total_trades + 1 
-                WHERE id = %s
-            """, (account_id,))
+            cursor.execute(_SQL_INCREMENT_TRADE_COUNT, (account_id,))
             self.connection.commit()
-            
+
             #logging.info(f"Trade recorded for account {account_id}: {symbol} {side} {quantity}")
-            return cursor.lastrowid
+            return trade_id
         except Error as e:
             logging.error(f"Error adding trade: {e}")
+            self.connection.rollback()
             return False
         finally:
             cursor.close()
@@ -510,11 +901,7 @@ class Database:
         # Check if exchange_type column exists, if not use fallback
         try:
             # Check if we have a unified accounts table or separate Phemex table
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM INFORMATION_SCHEMA.TABLES 
-                WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'phemex_accounts'
-            """, (os.getenv('DB_NAME', 'railway'),))
+            cursor.execute(_SQL_COUNT_PHEMEX_TABLE, (os.getenv('DB_NAME', 'railway'),))
 
             phemex_table_exists = cursor.fetchone()[0] > 0
             
@@ -538,11 +925,7 @@ class Database:
                 #logging.info("Created phemex_accounts table")
             
             # Insert into Phemex table
-            query = """
-            INSERT INTO phemex_accounts (user_email, exchange_type, api_key, secret_key, account_name)
-            VALUES (%s, %s, %s, %s, %s)
-            """
-            cursor.execute(query, (user_email, exchange_type, api_key, secret_key, account_name))
+            cursor.execute(_SQL_INSERT_PHEMEX_ACCOUNT, (user_email, exchange_type, api_key, secret_key, account_name))
             
             self.connection.commit()
             #logging.info(f"Phemex account added for {user_email}")
@@ -568,29 +951,10 @@ class Database:
             cursor = self.connection.cursor(dictionary=True)
             
             # Get all Phemex accounts
-            query = """
-            SELECT pa.id, pa.user_email, pa.exchange_type, pa.api_key, pa.secret_key, 
-                   pa.account_name, pa.total_trades, pa.created_at,
-                   u.email as user_email_ref
-            FROM phemex_accounts pa
-            LEFT JOIN users u ON pa.user_email = u.email
-            ORDER BY pa.created_at DESC
-            """
-            
-            #logging.info(f"Executing query: {query}")
-            cursor.execute(query)
+            cursor.execute(_SQL_SELECT_ALL_PHEMEX_ACCOUNTS)
             
             results = cursor.fetchall()
-            #logging.info(f"Raw query results: type={type(results)}, count={len(results) if results else 0}")
-            
-            # if results and len(results) > 0:
-            #     #logging.info(f"✅ Successfully found {len(results)} Phemex accounts")
-            #     for i, account in enumerate(results):
-            #         #logging.info(f"   Account {i+1}: ID={account.get('id')}, User={account.get('user_email')}, Name={account.get('account_name')}")
-            #     return list(results)
-            # else:
-            #     logging.info("📝 No Phemex accounts found in database")
-            #     return []
+            return results or []
                 
         except Error as e:
             logging.error(f"❌ Database error getting all Phemex accounts: {e}")
@@ -613,7 +977,7 @@ class Database:
             return []
             
         cursor = self.connection.cursor(dictionary=True)
-        query = "SELECT * FROM phemex_accounts WHERE user_email = %s"
+        query = _SQL_SELECT_USER_PHEMEX_ACCOUNTS
 
         try:
             cursor.execute(query, (user_email,))
@@ -634,10 +998,7 @@ class Database:
             return False
             
         cursor = self.connection.cursor()
-        query = """
-        DELETE FROM phemex_accounts 
-        WHERE id = %s AND user_email = %s
-        """
+        query = _SQL_DELETE_PHEMEX_ACCOUNT
         
         try:
             cursor.execute(query, (account_id, user_email))
@@ -663,10 +1024,7 @@ class Database:
             return None
             
         cursor = self.connection.cursor(dictionary=True)
-        query = """
-        SELECT * FROM phemex_accounts 
-        WHERE id = %s AND user_email = %s
-        """
+        query = _SQL_SELECT_PHEMEX_ACCOUNT_BY_ID
         
         try:
             cursor.execute(query, (account_id, user_email))
@@ -687,24 +1045,10 @@ class Database:
 
             cursor = self.connection.cursor(dictionary=True)
             if exchange_type == "binance":
-                query = """
-                SELECT t.* FROM trades t 
-                WHERE t.account_id = %s AND t.symbol = %s AND t.side = %s AND t.quantity = %s
-                AND t.status != 'CLOSED'
-                ORDER BY t.trade_time DESC
-                LIMIT 1
-                """
-                cursor.execute(query, (account_id, symbol, opposite_side, quantity))
+                cursor.execute(_SQL_FIND_MATCHING_TRADE, (account_id, symbol, opposite_side, quantity))
 
             elif exchange_type == "phemex":
-                query = """
-                SELECT pt.* FROM phemex_trades pt 
-                WHERE pt.account_id = %s AND pt.symbol = %s AND pt.side = %s AND pt.quantity = %s
-                AND pt.status != 'CLOSED'
-                ORDER BY pt.trade_time DESC
-                LIMIT 1
-                """
-                cursor.execute(query, (account_id, symbol, opposite_side, quantity))
+                cursor.execute(_SQL_FIND_MATCHING_PHEMEX_TRADE, (account_id, symbol, opposite_side, quantity))
 
             result = cursor.fetchone()
             return result
@@ -720,17 +1064,9 @@ class Database:
             cursor = self.connection.cursor()
 
             if exchange_type == "binance":
-                query = """
-                UPDATE trades
-                SET pnl = %s, end_balance = %s
-                WHERE id = %s
-                """
+                query = _SQL_UPDATE_TRADE_PNL
             elif exchange_type == "phemex":
-                query = """
-                UPDATE phemex_trades
-                SET pnl = %s, end_balance = %s
-                WHERE id = %s
-                """
+                query = _SQL_UPDATE_PHEMEX_TRADE_PNL
             else:
                 logging.error(f"Unsupported exchange type: {exchange_type}")
                 return False
@@ -815,13 +1151,7 @@ class Database:
                 from datetime import datetime
                 trade_time = datetime.now()
             
-            query = """
-            INSERT INTO phemex_trades 
-            (account_id, symbol, side, order_type, quantity, price, stop_price, order_id, status, source_order_id, trade_time, start_balance)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
-            cursor.execute(query, (account_id, symbol, side, order_type, quantity, price, stop_price, order_id, status, source_order_id, trade_time, start_balance))
+            cursor.execute(_SQL_INSERT_PHEMEX_TRADE, (account_id, symbol, side, order_type, quantity, price, stop_price, order_id, status, source_order_id, trade_time, start_balance))
             self.connection.commit()
             
             trade_id = cursor.lastrowid
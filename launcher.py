@@ -5,30 +5,151 @@ Run this script to start the copy trading bot with either Streamlit or FastAPI
 """
 
 import argparse
+import asyncio
+import compileall
+import importlib.util
+import signal
 import subprocess
 import sys
+import sysconfig
 import os
-from pathlib import Path
+import shutil
 
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
 
 
+def setup_environment():
+    """Create .env from .env.example on first run"""
+    if os.path.exists(".env"):
+        return True
+    if not os.path.exists(".env.example"):
+        print("No .env or .env.example found, relying on process environment variables")
+        return False
+    # Create the file owner-only first so the credentials filled in later are
+    # never world-readable; copyfile then writes into it without changing the mode
+    os.close(os.open(".env", os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+    shutil.copyfile(".env.example", ".env")
+    print("Created .env from .env.example - update it with your credentials")
+    return True
+
+def check_requirements():
+    """Report missing server packages and warm the bytecode cache"""
+    missing = [name for name in ("uvicorn", "uvloop", "httptools") if importlib.util.find_spec(name) is None]
+    # Byte-compile installed packages and the project modules once so later
+    # launches load .pyc files, unless bytecode writing is turned off
+    if not sys.dont_write_bytecode:
+        compileall.compile_dir(sysconfig.get_paths()["purelib"], quiet=1)
+        compileall.compile_dir(".", maxlevels=0, quiet=1)
+    if missing:
+        print(f"Missing packages: {', '.join(missing)}")
+        if os.path.isdir("vendor"):
+            # Install from bundled wheels without touching the index or the resolver
+            print(f"Install them with: {sys.executable} -m pip install --no-deps --no-index --find-links vendor/ {' '.join(missing)}")
+        else:
+            print(f"Install them with: {sys.executable} -m pip install {' '.join(missing)}")
+        return False
+    print("All requirements satisfied!")
+    return True
+
+def streamlit_command():
+    """Command line for running the Streamlit application"""
+    return [sys.executable, "-m", "streamlit", "run", "script.py"]
 
 def start_streamlit():
     """Start the Streamlit application"""
     print("Starting Streamlit application...")
-    subprocess.run([sys.executable, "-m", "streamlit", "run", "script.py"])
+    if os.name == "nt":
+        subprocess.run(streamlit_command())
+        return
+    # Hand this process over to Streamlit instead of idling as its parent
+    sys.stdout.flush()
+    command = streamlit_command()
+    os.execvp(command[0], command)
 
-def start_fastapi():
+def uvicorn_loop_options():
+    """Use uvloop/httptools when installed, else uvicorn's asyncio/h11 defaults"""
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
+
+def start_fastapi(dev=False, workers=1):
     """Start the FastAPI application"""
     print("Starting FastAPI application...")
+    loop, http = uvicorn_loop_options()
+    # uvicorn cannot combine the reloader with multiple worker processes
+    reload = dev and workers == 1
+    if uvicorn is None:
+        raise SystemExit("uvicorn missing; run launcher.py --check")
+    app = "api:app"
+    if not reload and workers == 1:
+        # A single in-process server can take the app object directly; the
+        # reloader and worker processes need the import string instead
+        from api import app
+    uvicorn.run(app, host="0.0.0.0", port=8000, reload=reload, workers=workers, loop=loop, http=http)
+
+def fastapi_command(dev=False, workers=1):
+    """Command line for running the FastAPI application as a uvicorn process"""
+    loop, http = uvicorn_loop_options()
+    command = [
+        sys.executable, "-m", "uvicorn", "api:app",
+        "--host", "0.0.0.0", "--port", "8000",
+        "--loop", loop, "--http", http,
+        "--workers", str(workers),
+    ]
+    if dev and workers == 1:
+        command.append("--reload")
+    return command
+
+async def stop_processes(processes, timeout=5):
+    """Terminate child processes, killing any that ignore the request"""
+    for process in processes:
+        if process.returncode is None:
+            process.terminate()
+    for process in processes:
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+async def supervise(dev=False, workers=1):
+    """Run FastAPI and Streamlit together and stop both as soon as either exits"""
+    processes = [
+        await asyncio.create_subprocess_exec(*fastapi_command(dev, workers)),
+        await asyncio.create_subprocess_exec(*streamlit_command()),
+    ]
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except NotImplementedError:
+            # Not supported on Windows; Ctrl-C cancels the task instead
+            pass
+    
+    waiters = [asyncio.ensure_future(process.wait()) for process in processes]
+    stopper = asyncio.ensure_future(stop.wait())
     try:
-        import uvicorn
-        uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
-    except ImportError:
-        print("uvicorn not found. Installing...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "uvicorn"])
-        import uvicorn
-        uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
+        await asyncio.wait([*waiters, stopper], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # Neither server outlives the other or the launcher, however we got here
+        stopper.cancel()
+        await stop_processes(processes)
+
+def start_both(dev=False, workers=1):
+    """Start FastAPI and Streamlit side by side as child processes"""
+    sys.stdout.write(
+        "Starting both Streamlit and FastAPI...\n"
+        "FastAPI will run on http://localhost:8000\n"
+        "Streamlit will run on http://localhost:8501\n"
+    )
+    sys.stdout.flush()
+    
+    asyncio.run(supervise(dev, workers))
 
 def main():
     """Main launcher function"""
@@ -44,36 +165,44 @@ def main():
         action="store_true",
         help="Check requirements and setup"
     )
+    parser.add_argument(
+        "--dev",
+        action="store_true",
+        help="Enable auto-reload for the FastAPI server"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of FastAPI worker processes (default: 1; each runs its own bot)"
+    )
     
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and args.mode != "streamlit":
+        # api.py imports the bot singleton, so every worker gets its own CopyTradingBot
+        print(f"Warning: {args.workers} FastAPI workers each run a separate copy trading bot; "
+              "/api/bot/start and /stop reach only one of them and orders may be mirrored more than once")
     
     # Change to script directory
-    os.chdir(Path(__file__).parent)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
-    print("Copy Trading Bot Launcher")
-    print("=" * 10)
+    sys.stdout.write("Copy Trading Bot Launcher\n" + "=" * 10 + "\n")
+    
+    setup_environment()
     
     if args.check:
-        print("All requirements satisfied!")
+        check_requirements()
         return
     
     # Start the application
     if args.mode == "streamlit":
         start_streamlit()
     elif args.mode == "fastapi":
-        start_fastapi()
+        start_fastapi(args.dev, args.workers)
     elif args.mode == "both":
-        print("Starting both Streamlit and FastAPI...")
-        print("FastAPI will run on http://localhost:8000")
-        print("Streamlit will run on http://localhost:8501")
-        
-        # Start FastAPI in background
-        import threading
-        api_thread = threading.Thread(target=start_fastapi, daemon=True)
-        api_thread.start()
-        
-        # Start Streamlit in foreground
-        start_streamlit()
+        start_both(args.dev, args.workers)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
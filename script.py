@@ -4,14 +4,19 @@ Main application entry point for the web-based copy trading dashboard
 """
 
 import streamlit as st
+import pandas as pd
 import hashlib
-import time
 import logging
 import os
+from dotenv import load_dotenv
 from datetime import datetime
 from typing import Optional, Dict, List
 from dataclasses import dataclass
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+
+# Settings such as SERVER_IP are read before the database module loads .env
+load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,32 +29,190 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Import application modules
-try:
+# Application modules are imported on first use: the database driver when a
+# page first needs the database, the exchange clients (ccxt, python-binance)
+# and the bot only on the views that use them, so the login page starts faster
+@st.cache_resource(show_spinner=False)
+def get_db():
+    """Shared Database instance, reused across reruns and sessions"""
     from database import Database
-    from binance_config import BinanceClient, PhemexClient
+    db = Database()
+    # Runs once per process, so a Streamlit-only deployment also gets its
+    # trade indexes and admin login
+    db.ensure_indexes()
+    db.ensure_admin()
+    return db
+
+@st.cache_resource(show_spinner=False)
+def get_bot():
+    """The copy trading bot singleton, imported on first admin use"""
     from bot_config import bot
-except ImportError as e:
-    st.error(f"Failed to import required modules: {e}")
-    st.stop()
+    return bot
+
+# Same fallback as bot_config.DEFAULT_SERVER_IP; read here so showing the IP
+# does not import the bot
+_DEFAULT_SERVER_IP = '208.77.246.15'
+
+def server_ip():
+    """Server IP users whitelist on their exchange API keys"""
+    return os.getenv('SERVER_IP') or _DEFAULT_SERVER_IP
+
+def _credentials_hash(api_key, secret_key):
+    """Short digest identifying a key pair without putting the secrets in a cache key"""
+    return hashlib.blake2b(f"{api_key}:{secret_key}".encode(), digest_size=16).hexdigest()
+
+@st.cache_resource(ttl=300, show_spinner=False)
+def _get_binance_client(credentials_hash, _api_key, _secret_key):
+    """Shared BinanceClient per key pair so its HTTP session is reused across checks"""
+    from binance_config import BinanceClient
+    return BinanceClient(api_key=_api_key, secret_key=_secret_key)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _validate_binance_credentials(credentials_hash, _api_key, _secret_key):
+    # Underscore arguments are excluded from the cache key; credentials_hash stands in for them
+    return _get_binance_client(credentials_hash, _api_key, _secret_key).test_connection()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_connection_status(credentials_hash, _api_key, _secret_key):
+    return _get_binance_client(credentials_hash, _api_key, _secret_key).test_connection()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_connection_statuses(credentials_hashes, _credentials):
+    """Connection status for several key pairs, checked concurrently"""
+    clients = []
+    for credentials_hash, (api_key, secret_key) in zip(credentials_hashes, _credentials):
+        try:
+            clients.append(_get_binance_client(credentials_hash, api_key, secret_key))
+        except Exception as e:
+            logging.error(f"Could not create Binance client: {e}")
+            clients.append(None)
+    # test_connection is a blocking REST call, so fan the checks out over threads
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(lambda client: client is not None and client.test_connection(), clients))
+
+def binance_connection_statuses(accounts):
+    """Map account id to connection status for a list of Binance accounts"""
+    credentials = tuple((account['api_key'], account['secret_key']) for account in accounts)
+    credentials_hashes = tuple(_credentials_hash(api_key, secret_key) for api_key, secret_key in credentials)
+    statuses = _cached_connection_statuses(credentials_hashes, credentials)
+    return {account['id']: connected for account, connected in zip(accounts, statuses)}
+
+def binance_connection_status(api_key, secret_key, refresh=False):
+    """Whether the key pair can reach Binance, re-checked at most every 30 seconds unless refresh is set"""
+    credentials_hash = _credentials_hash(api_key, secret_key)
+    if refresh:
+        _cached_connection_status.clear(credentials_hash, api_key, secret_key)
+    return _cached_connection_status(credentials_hash, api_key, secret_key)
+
+# Read-only listings cached briefly so button clicks and reruns skip the table
+# scans; mutations clear the matching loaders below before calling st.rerun()
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_admin_overview():
+    return get_db().get_admin_overview()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_user_account_lists(user_email):
+    """(Binance accounts, Phemex accounts) of one user, queried concurrently"""
+    db = get_db()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        binance_accounts = executor.submit(db.get_user_accounts, user_email)
+        phemex_accounts = executor.submit(db.get_user_phemex_accounts, user_email)
+        return binance_accounts.result(), phemex_accounts.result()
+
+def _cached_user_accounts(user_email):
+    return _cached_user_account_lists(user_email)[0]
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_all_phemex_accounts():
+    return get_db().get_all_phemex_accounts() or []
+
+def _cached_user_phemex_accounts(user_email):
+    return _cached_user_account_lists(user_email)[1]
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _cached_all_account_trades():
+    """Every Binance account's recent trades for the admin stats, in one query"""
+    trades = get_db().get_all_account_trades()
+    for trade in trades:
+        trade['account_name'] = trade.get('account_name') or 'Unnamed Account'
+    return trades
+
+# Trade caches below are keyed by Database.get_trades_etag instead of a TTL:
+# the entry is reused until the account's trades actually change
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_trade_page(account_id, etag, symbol, side, status, limit, offset):
+    """(rows, total) for one filtered page of the account's trade history"""
+    return get_db().query_account_trades(account_id, symbol, side, status, limit, offset)
+
+# Trade statuses counted as successful in trade summaries
+_OK_STATUSES = frozenset({'FILLED', 'MIRRORED'})
+
+# Columns the trades table reads, whichever exchange the rows came from
+_TRADE_TABLE_COLUMNS = [
+    'symbol', 'side', 'status', 'quantity', 'price', 'pnl', 'trade_time',
+    'start_balance', 'end_balance', 'account_name', 'exchange',
+]
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_account_bundle(account_id, user_email, etag):
+    """Account row, trade counts and filter values for the details page, loaded over one connection"""
+    bundle = get_db().get_account_bundle(account_id, user_email)
+    if not bundle:
+        return None
+    # Filter choices only: a NULL symbol/status cannot be matched with "= %s",
+    # and those trades still show under "All"
+    bundle['symbols'] = [symbol for symbol in bundle['symbols'] if symbol is not None]
+    bundle['statuses'] = [status for status in bundle['statuses'] if status is not None]
+    return bundle
+
+# cache_resource hands every session the same bytes object; cache_data would
+# unpickle a fresh multi-MB copy of the guide on each access
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_guide_pdf(path, mtime):
+    """Bytes of a setup guide PDF; mtime is part of the key so edits are picked up"""
+    with open(path, 'rb') as pdf_file:
+        return pdf_file.read()
+
+def _mask_keys(keys):
+    """First and last 8 characters of each API key, for display in account tables"""
+    keys = keys.fillna('')
+    return (keys.str.slice(0, 8) + '...' + keys.str.slice(-8)).where(keys != '')
+
+def clear_user_caches():
+    """Invalidate cached user listings after an approval change"""
+    _cached_admin_overview.clear()
+
+def clear_account_caches(user_email=None):
+    """Invalidate cached account listings after an add/update/delete
+
+    With user_email only that owner's listings are dropped, so other users'
+    sessions keep their cached accounts; the admin listings are always cleared.
+    """
+    _cached_admin_overview.clear()
+    _cached_all_phemex_accounts.clear()
+    if user_email is None:
+        _cached_user_account_lists.clear()
+    else:
+        _cached_user_account_lists.clear(user_email)
+    _cached_account_bundle.clear()
+    _cached_all_account_trades.clear()
+
+# Display conversions by exact type; anything else (datetime, Timestamp, ...) goes through str()
+_DT_FORMATTERS = {type(None): lambda dt_value: 'N/A', str: lambda dt_value: dt_value}
 
 # Utility function to safely convert datetime to string
 def safe_datetime_to_string(dt_value):
     """Convert any datetime value to a safe string for Streamlit display"""
-    if dt_value is None:
-        return 'N/A'
-    
-    try:
-        # If it's a datetime object, format it
-        if hasattr(dt_value, 'strftime'):
-            return str(dt_value)
-        elif isinstance(dt_value, str):
-            return str(dt_value)  # Remove microseconds and limit length
-        # For anything else, convert to string
-        else:
-            return str(dt_value)
-    except Exception:
-        return str(dt_value) if dt_value else 'N/A'
+    return _DT_FORMATTERS.get(type(dt_value), str)(dt_value)
+
+# Display icons for user roles and approval statuses
+_ROLE_ICON = {'admin': '👑', 'user': '👤'}
+_STATUS_EMOJI = {'approved': '🟢', 'pending': '🟡', 'rejected': '🔴'}
+_EXCHANGE_ICONS = {'binance': '🔶', 'bybit': '🟡', 'phemex': '🔴'}
+
+# Exchanges offered when adding an account
+_EXCHANGE_OPTIONS = {'binance': 'Binance', 'phemex': 'Phemex'}
+_EXCHANGE_KEYS = tuple(_EXCHANGE_OPTIONS)
 
 # Enums for better type safety
 class UserRole(Enum):
@@ -89,24 +252,44 @@ class SessionManager:
             st.session_state.show_account_details = False
         if 'accounts_refresh_trigger' not in st.session_state:
             st.session_state.accounts_refresh_trigger = 0
+        if 'account_ui' not in st.session_state:
+            st.session_state.account_ui = {}
+
+    @staticmethod
+    def account_ui_state(account_id, exchange: str = 'binance') -> Dict[str, bool]:
+        """Edit/delete-confirmation flags for one account, kept in one dict per exchange"""
+        accounts = st.session_state.account_ui.setdefault(exchange, {})
+        return accounts.setdefault(account_id, {'edit': False, 'confirm_delete': False})
+
+    @staticmethod
+    def flash(message: str, icon: Optional[str] = None) -> None:
+        """Queue a toast to show after the next rerun instead of sleeping before it"""
+        st.session_state.setdefault('_flash', []).append((message, icon))
+
+    @staticmethod
+    def show_flash() -> None:
+        """Show and clear toasts queued by flash()"""
+        for message, icon in st.session_state.pop('_flash', []):
+            st.toast(message, icon=icon)
 
     @staticmethod
-    def trigger_accounts_refresh():
+    def trigger_accounts_refresh(user_email: Optional[str] = None):
         """Trigger a refresh of the accounts display"""
         st.session_state.accounts_refresh_trigger = st.session_state.get('accounts_refresh_trigger', 0) + 1
+        clear_account_caches(user_email)
 
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash password using SHA256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password with salted scrypt"""
+        from database import hash_password
+        return hash_password(password)
 
     @staticmethod
     def authenticate_user(email: str, password: str) -> Optional[User]:
         """Authenticate user and return user data"""
         try:
-            db = Database()
-            hashed_password = SessionManager.hash_password(password)
-            user_data = db.authenticate_user(email, hashed_password)
+            db = get_db()
+            user_data = db.authenticate_user(email, password)
             
             if user_data:
                 return User(
@@ -124,7 +307,7 @@ class SessionManager:
     def register_user(email: str, password: str) -> bool:
         """Register new user with pending status"""
         try:
-            db = Database()
+            db = get_db()
             hashed_password = SessionManager.hash_password(password)
             return db.register_user(email, hashed_password)
         except Exception as e:
@@ -205,8 +388,7 @@ class AuthenticationUI:
                         st.session_state.authenticated = True
                         st.session_state.user_data = user
                         st.session_state.current_page = 'dashboard'
-                        st.success(f"Welcome back, {user.email}!")
-                        time.sleep(1)
+                        SessionManager.flash(f"Welcome back, {user.email}!")
                         st.rerun()
                     elif user.status == UserStatus.PENDING.value:
                         st.warning("⏳ Your account is pending approval. Please wait for admin approval.")
@@ -241,9 +423,8 @@ class AuthenticationUI:
                     st.error("❌ Password must be at least 6 characters long.")
                 else:
                     if SessionManager.register_user(email, password):
-                        st.success("✅ Registration successful! Your account is pending admin approval.")
-                        st.info("📧 You will be notified once your account is approved.")
-                        time.sleep(2)
+                        SessionManager.flash("✅ Registration successful! Your account is pending admin approval.")
+                        SessionManager.flash("You will be notified once your account is approved.", icon="📧")
                         st.session_state.show_register = False
                         st.rerun()
                     else:
@@ -286,13 +467,13 @@ class AdminDashboard:
     def _show_admin_metrics() -> None:
         """Show admin dashboard metrics"""
         try:
-            db = Database()
-            
             # Get metrics
-            all_users = db.get_all_users()
-            pending_users = db.get_pending_users()
-            all_accounts = db.get_all_binance_accounts()
+            overview = _cached_admin_overview()
+            all_users = overview['all_users']
+            pending_users = overview['pending_users']
+            all_accounts = overview['accounts']
             
+            bot = get_bot()
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
@@ -313,14 +494,22 @@ class AdminDashboard:
             st.error(f"Error loading metrics: {e}")
 
     @staticmethod
+    @st.fragment
     def _show_bot_control() -> None:
         """Bot control panel for admin"""
+        # Start/Stop rerun only this panel; the header metrics catch up on the next full run
+        SessionManager.show_flash()
         st.subheader("🤖 Copy Trading Bot Control")
+        try:
+            bot = get_bot()
+        except ImportError as e:
+            st.error(f"Failed to load the trading bot: {e}")
+            return
         
         # Server info
         col1, col2 = st.columns(2)
         with col1:
-            st.info(f"🌐 **Server IP**: 208.77.246.15")
+            st.info(f"🌐 **Server IP**: {server_ip()}")
         
         with col2:
             status = "Running" if bot.is_running else "Stopped"
@@ -335,9 +524,8 @@ class AdminDashboard:
             if st.button("Start Bot", disabled=bot.is_running, use_container_width=True, type="primary"):
                 with st.spinner("Starting bot..."):
                     if bot.start_bot():
-                        st.success("Copy trading bot started successfully!")
-                        time.sleep(1)
-                        st.rerun()
+                        SessionManager.flash("Copy trading bot started successfully!")
+                        st.rerun(scope="fragment")
                     else:
                         st.error(" Failed to start bot. Check configuration.")
         
@@ -345,9 +533,8 @@ class AdminDashboard:
             if st.button("Stop Bot", disabled=not bot.is_running, use_container_width=True):
                 with st.spinner("Stopping bot..."):
                     bot.stop_bot()
-                    st.success("Copy trading bot stopped!")
-                    time.sleep(1)
-                    st.rerun()
+                    SessionManager.flash("Copy trading bot stopped!")
+                    st.rerun(scope="fragment")
         
         with col3:
             if bot.is_running:
@@ -360,142 +547,235 @@ class AdminDashboard:
         """User management panel"""
         st.subheader("👥 User Management")
         
+        # Each section is a fragment, so an approve/reject click reruns only that section
+        AdminDashboard._show_pending_users()
+        
+        st.markdown("---")
+        
+        AdminDashboard._show_all_users()
+
+    @staticmethod
+    @st.fragment
+    def _show_pending_users() -> None:
+        """Pending approvals section"""
+        # A fragment rerun skips main(), so show this section's own toasts here
+        SessionManager.show_flash()
         try:
-            db = Database()
+            db = get_db()
             
-            # Pending approvals section
-            pending_users = db.get_pending_users()
+            pending_users = _cached_admin_overview()['pending_users']
             if pending_users:
                 st.warning(f"**{len(pending_users)} users awaiting approval**")
                 
-                for user in pending_users:
-                    with st.container():
-                        col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
-                        
-                        with col1:
-                            st.write(f"**{user['email']}**")
-                        
-                        with col2:
-                            st.caption(f"Registered: {user['created_at']}")
-                        
-                        with col3:
-                            if st.button(" Approve", key=f"approve_{user['id']}", type="primary"):
-                                if db.approve_user(user['id'], st.session_state.user_data.id):
-                                    st.success(f"Approved {user['email']}")
-                                    time.sleep(1)
-                                    st.rerun()
-                        
-                        with col4:
-                            if st.button("Reject", key=f"reject_{user['id']}"):
-                                if db.reject_user(user['id'], st.session_state.user_data.id):
-                                    st.error(f"Rejected {user['email']}")
-                                    time.sleep(1)
-                                    st.rerun()
-                        
-                        st.divider()
+                # One editable table instead of a row of widgets per user; the form
+                # holds every decision until submit, then applies them in one transaction
+                with st.form("bulk_user_mgmt"):
+                    pending_df = pd.DataFrame(pending_users, columns=['id', 'email', 'created_at'])
+                    pending_df['decision'] = "Skip"
+                    edited_df = st.data_editor(
+                        pending_df,
+                        hide_index=True,
+                        use_container_width=True,
+                        key="pending_users_editor",
+                        disabled=['email', 'created_at'],
+                        column_config={
+                            'id': None,
+                            'email': st.column_config.TextColumn("Email"),
+                            'created_at': st.column_config.DatetimeColumn("Registered"),
+                            'decision': st.column_config.SelectboxColumn(
+                                "Decision", options=["Skip", "Approve", "Reject"], required=True
+                            ),
+                        }
+                    )
+                    submitted = st.form_submit_button("Apply decisions", type="primary")
+                
+                if submitted:
+                    approve_ids = edited_df.loc[edited_df['decision'] == "Approve", 'id'].tolist()
+                    reject_ids = edited_df.loc[edited_df['decision'] == "Reject", 'id'].tolist()
+                    
+                    if not approve_ids and not reject_ids:
+                        st.info("Choose Approve or Reject for at least one user")
+                    elif db.bulk_update_user_status(approve_ids, reject_ids, st.session_state.user_data.id) is not False:
+                        clear_user_caches()
+                        SessionManager.flash(f"Approved {len(approve_ids)}, rejected {len(reject_ids)} users")
+                        # Full rerun: the metrics and All Users table show these statuses too
+                        st.rerun()
+                    else:
+                        st.error("Failed to update user statuses")
             else:
                 st.info("No pending user approvals")
-            
-            st.markdown("---")
-            
-            # All users section
-            st.subheader("📋 All Users")
-            all_users = db.get_all_users()
+                        
+        except Exception as e:
+            st.error(f"Error loading user management: {e}")
+
+    @staticmethod
+    @st.fragment
+    def _show_all_users() -> None:
+        """All users section"""
+        st.subheader("📋 All Users")
+        
+        try:
+            db = get_db()
+            all_users = _cached_admin_overview()['all_users']
             
             if all_users:
-                for user in all_users:
-                    with st.container():
-                        col1, col2, col3, col4 = st.columns([3, 1, 2, 2])
-                        
+                users_df = pd.DataFrame(all_users)
+                role_icons = users_df['role'].map(_ROLE_ICON).fillna('👤')
+                status_icons = users_df['status'].map(_STATUS_EMOJI).fillna('⚪')
+                users_df['user'] = role_icons + ' ' + users_df['email']
+                users_df['status_display'] = status_icons + ' ' + users_df['status'].str.title()
+                
+                event = st.dataframe(
+                    users_df[['user', 'status_display', 'created_at', 'approved_by_email']],
+                    hide_index=True,
+                    use_container_width=True,
+                    on_select="rerun",
+                    selection_mode="single-row",
+                    key="all_users_table",
+                    column_config={
+                        'user': st.column_config.TextColumn("User"),
+                        'status_display': st.column_config.TextColumn("Status"),
+                        'created_at': st.column_config.DatetimeColumn("Joined"),
+                        'approved_by_email': st.column_config.TextColumn("By"),
+                    }
+                )
+                
+                # Approve/Reject are only rendered for a selected pending user
+                selected_rows = event.selection.rows
+                if selected_rows and selected_rows[0] < len(all_users):
+                    user = all_users[selected_rows[0]]
+                    if user['status'] == 'pending':
+                        col1, col2, col3 = st.columns([2, 1, 1])
                         with col1:
-                            role_icon = "👑" if user['role'] == 'admin' else "👤"
-                            st.write(f"{role_icon} **{user['email']}**")
-                        
+                            st.write(f"**{user['email']}**")
                         with col2:
-                            status_color = {
-                                'approved': '🟢',
-                                'pending': '🟡', 
-                                'rejected': '🔴'
-                            }
-                            st.write(f"{status_color.get(user['status'], '⚪')} {user['status'].title()}")
-                        
+                            approve = st.button("Approve", key=f"approve_{user['id']}", type="primary", use_container_width=True)
                         with col3:
-                            st.caption(f"Joined: {user['created_at']}")
-                        
-                        with col4:
-                            if user['approved_by_email']:
-                                st.caption(f"By: {user['approved_by_email']}")
-                        
-                        st.divider()
+                            reject = st.button("Reject", key=f"reject_{user['id']}", use_container_width=True)
+                        if approve or reject:
+                            approve_ids, reject_ids = ([user['id']], []) if approve else ([], [user['id']])
+                            if db.bulk_update_user_status(approve_ids, reject_ids, st.session_state.user_data.id):
+                                clear_user_caches()
+                                SessionManager.flash(f"User {user['email']} {'approved' if approve else 'rejected'}")
+                                # The pending list is a separate fragment, so refresh the whole page
+                                st.rerun()
+                            else:
+                                st.error("Failed to update user status")
+                    else:
+                        st.caption(f"{user['email']} is already {user['status']}")
                         
         except Exception as e:
             st.error(f"Error loading user management: {e}")
 
     @staticmethod
+    @st.fragment
     def _show_account_management() -> None:
         """Enhanced account management for admin with Binance and Phemex tabs"""
+        # Edits and deletes rerun only this section
+        SessionManager.show_flash()
         st.subheader("Trading Account Management")
         
         try:
-            db = Database()
+            db = get_db()
             # Two tabs: Binance and Phemex
             binance_tab, phemex_tab = st.tabs(["Binance Accounts", "Phemex Accounts"])
 
             with binance_tab:
                 try:
-                    accounts = db.get_all_binance_accounts()
+                    # The admin overview already selects every Binance account
+                    accounts = _cached_admin_overview()['accounts']
                     
                     if accounts:
                         st.info(f"**Binance Accounts**: {len(accounts)}")
-                        for account in accounts:
-                            with st.expander(f" {account['account_name'] or 'Unnamed Account'} - {account['user_email']}"):
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    st.write("**Account Details:**")
-                                    st.write(f"• **Owner**: {account['user_email']}")
-                                    st.write(f"• **Created**: {account.get('created_at', 'N/A')}")
-                                    st.write(f"• **Total Trades**: {account.get('total_trades', 0)}")
+                        # One editable table for every account; the form holds the edits
+                        # until Save, then only the rows that changed are written
+                        with st.form("admin_binance_accounts_form"):
+                            accounts_df = pd.DataFrame(accounts)
+                            accounts_df['api_masked'] = _mask_keys(accounts_df['api_key'])
+                            accounts_df = accounts_df[['id', 'account_name', 'user_email', 'created_at', 'total_trades', 'api_masked']]
+                            accounts_df['account_name'] = accounts_df['account_name'].fillna('')
+                            accounts_df['new_api_key'] = ''
+                            accounts_df['new_secret_key'] = ''
+                            edited_df = st.data_editor(
+                                accounts_df,
+                                hide_index=True,
+                                use_container_width=True,
+                                num_rows="fixed",
+                                key="admin_binance_accounts_editor",
+                                disabled=['user_email', 'created_at', 'total_trades', 'api_masked'],
+                                column_config={
+                                    'id': None,
+                                    'account_name': st.column_config.TextColumn("Account"),
+                                    'user_email': st.column_config.TextColumn("Owner"),
+                                    'created_at': st.column_config.DatetimeColumn("Created"),
+                                    'total_trades': st.column_config.NumberColumn("Total Trades"),
+                                    'api_masked': st.column_config.TextColumn("API Key"),
+                                    'new_api_key': st.column_config.TextColumn("New API Key", help="Leave blank to keep the current key"),
+                                    'new_secret_key': st.column_config.TextColumn("New Secret", help="Leave blank to keep the current secret"),
+                                }
+                            )
+                            submitted = st.form_submit_button("Save changes", type="primary")
+                        
+                        if submitted:
+                            new_names = edited_df['account_name'].fillna('').str.strip()
+                            new_api_keys = edited_df['new_api_key'].fillna('').str.strip()
+                            new_secrets = edited_df['new_secret_key'].fillna('').str.strip()
+                            changed = (
+                                (new_names != accounts_df['account_name']) | (new_api_keys != '') | (new_secrets != '')
+                            )
+                            
+                            if not changed.any():
+                                st.info("No changes to save")
+                            else:
+                                by_id = {account['id']: account for account in accounts}
+                                failed = 0
+                                for index in edited_df.index[changed]:
+                                    account = by_id[edited_df.at[index, 'id']]
+                                    if not db.update_binance_account(
+                                        account['id'],
+                                        new_api_keys[index] or account['api_key'],
+                                        new_secrets[index] or account['secret_key'],
+                                        new_names[index],
+                                    ):
+                                        failed += 1
+                                clear_account_caches()
+                                SessionManager.flash(f"Updated {int(changed.sum())} accounts")
+                                if failed:
+                                    SessionManager.flash(f"{failed} account changes failed", icon="⚠️")
+                                st.rerun(scope="fragment")
+                        
+                        # Deleting stops mirroring to the account, so it stays a
+                        # separate step with its own confirmation outside the edit form
+                        names = {account['id']: f"{account['account_name'] or 'Unnamed Account'} - {account['user_email']}" for account in accounts}
+                        col1, col2, col3 = st.columns([2, 1, 1])
+                        with col1:
+                            delete_id = st.selectbox(
+                                "Delete account", [None, *names],
+                                format_func=lambda account_id: "Select an account" if account_id is None else names[account_id],
+                                key="admin_binance_delete_select",
+                            )
+                        if delete_id is not None:
+                            ui_state = SessionManager.account_ui_state(delete_id)
+                            if ui_state['confirm_delete']:
+                                st.warning(f"Delete **{names[delete_id]}**? Its trades stop being mirrored.")
                                 with col2:
-                                    st.write("**API Configuration:**")
-                                    api_key = account.get('api_key', '')
-                                    secret_key = account.get('secret_key', '')
-                                    if api_key:
-                                        st.code(f"API Key: {api_key[:8]}...{api_key[-8:]}")
-                                    if secret_key:
-                                        st.code(f"Secret: {secret_key[:8]}...{secret_key[-8:]}")
-                                # Account actions
-                                col1a, col2a, col3a = st.columns(3)
-                                with col1a:
-                                    if st.button("Edit", key=f"edit_{account['id']}"):
-                                        st.session_state[f"editing_{account['id']}"] = True
-                                        st.rerun()
-                                with col2a:
-                                    if st.button("Delete", key=f"delete_{account['id']}", type="secondary"):
-                                        if st.button("Confirm Delete", key=f"confirm_delete_{account['id']}", type="primary"):
-                                            if db.delete_account_admin(account['id']):
-                                                st.success("Account deleted!")
-                                                time.sleep(1)
-                                                st.rerun()
-                                # Edit form
-                                if st.session_state.get(f"editing_{account['id']}", False):
-                                    with st.form(f"edit_form_{account['id']}"):
-                                        st.write("**Edit Account:**")
-                                        new_name = st.text_input("Account Name", value=account['account_name'] or "")
-                                        new_api_key = st.text_input("API Key", value=account.get('api_key', ''))
-                                        new_secret = st.text_input("Secret Key", value=account.get('secret_key', ''), type="password")
-                                        colL, colR = st.columns(2)
-                                        with colL:
-                                            if st.form_submit_button("Save", type="primary"):
-                                                if db.update_binance_account(account['id'], new_api_key, new_secret, new_name):
-                                                    st.success("Account updated!")
-                                                    st.session_state[f"editing_{account['id']}"] = False
-                                                    time.sleep(1)
-                                                    st.rerun()
-                                        with colR:
-                                            if st.form_submit_button("Cancel"):
-                                                st.session_state[f"editing_{account['id']}"] = False
-                                                st.rerun()
-                                st.divider()
+                                    if st.button("Confirm Delete", key=f"admin_delete_confirm_{delete_id}", type="primary", use_container_width=True):
+                                        if db.delete_account_admin(delete_id):
+                                            clear_account_caches()
+                                            ui_state['confirm_delete'] = False
+                                            SessionManager.flash("Account deleted!")
+                                            st.rerun(scope="fragment")
+                                        else:
+                                            st.error("Failed to delete account")
+                                with col3:
+                                    if st.button("Cancel", key=f"admin_delete_cancel_{delete_id}", use_container_width=True):
+                                        ui_state['confirm_delete'] = False
+                                        st.rerun(scope="fragment")
+                            else:
+                                with col2:
+                                    if st.button("Delete", key=f"admin_delete_{delete_id}", type="secondary", use_container_width=True):
+                                        ui_state['confirm_delete'] = True
+                                        st.rerun(scope="fragment")
                     else:
                         st.info("📝 No trading accounts configured yet")
                 except Exception as e:
@@ -505,82 +785,84 @@ class AdminDashboard:
                 try:
                     # Try to fetch all Phemex accounts (admin view)
                     try:
-                        p_accounts = db.get_all_phemex_accounts()
+                        p_accounts = _cached_all_phemex_accounts()
                     except Exception as fetch_err:
                         logging.warning(f"get_all_phemex_accounts unavailable or failed: {fetch_err}")
                         p_accounts = []
                     
                     if p_accounts:
                         st.info(f"📊 **Phemex Accounts**: {len(p_accounts)}")
-                        for account in p_accounts:
-                            with st.expander(f"💳 {account.get('account_name') or 'Unnamed Account'} - {account.get('user_email', '')}"):
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    st.write("**Account Details:**")
-                                    st.write(f"• **Owner**: {account.get('user_email', 'N/A')}")
-                                    st.write(f"• **Created**: {account.get('created_at', 'N/A')}")
-                                    # Total trades (from precomputed field or fallback to query)
-                                    total_trades = account.get('total_trades')
-                                    if total_trades is None:
-                                        try:
-                                            trades = db.get_phemex_trades(account_id=account['id'])
-                                            total_trades = len(trades)
-                                        except Exception:
-                                            total_trades = 'N/A'
-                                    st.write(f"• **Total Trades**: {total_trades}")
-                                with col2:
-                                    st.write("**API Configuration:**")
-                                    api_key = account.get('api_key', '')
-                                    secret_key = account.get('secret_key', '')
-                                    if api_key:
-                                        st.code(f"API Key: {api_key[:8]}...{api_key[-8:]}")
-                                    if secret_key:
-                                        st.code(f"Secret: {secret_key[:8]}...{secret_key[-8:]}")
-                                # Actions (Edit if available, Delete with admin or fallback)
-                                col1a, col2a = st.columns(2)
-                                with col1a:
-                                    if hasattr(db, 'update_phemex_account'):
-                                        if st.button("Edit", key=f"phemex_edit_{account['id']}"):
-                                            st.session_state[f"phemex_editing_{account['id']}"] = True
-                                            st.rerun()
-                                with col2a:
-                                    if st.button("Delete", key=f"phemex_delete_{account['id']}", type="secondary"):
-                                        deleted = False
-                                        try:
-                                            if hasattr(db, 'delete_phemex_account_admin'):
-                                                deleted = db.delete_phemex_account_admin(account['id'])
-                                            else:
-                                                deleted = db.delete_phemex_account(account['id'], account.get('user_email'))
-                                        except Exception as de:
-                                            logging.error(f"Delete Phemex account failed: {de}")
-                                        if deleted:
-                                            st.success("Phemex account deleted!")
-                                            time.sleep(1)
-                                            st.rerun()
-                                # Edit form (only if method exists)
-                                if st.session_state.get(f"phemex_editing_{account['id']}", False) and hasattr(db, 'update_phemex_account'):
-                                    with st.form(f"phemex_edit_form_{account['id']}"):
-                                        new_name = st.text_input("Account Name", value=account.get('account_name', '') or '')
-                                        new_api_key = st.text_input("API Key", value=account.get('api_key', '') or '')
-                                        new_secret = st.text_input("Secret Key", value=account.get('secret_key', '') or '', type="password")
-                                        c1, c2 = st.columns(2)
-                                        with c1:
-                                            if st.form_submit_button("Save", type="primary"):
-                                                try:
-                                                    if db.update_phemex_account(account['id'], new_api_key, new_secret, new_name):
-                                                        st.success("Account updated!")
-                                                        st.session_state[f"phemex_editing_{account['id']}"] = False
-                                                        time.sleep(1)
-                                                        st.rerun()
-                                                    else:
-                                                        st.error("Failed to update account")
-                                                except Exception as ue:
-                                                    st.error(f"Update error: {ue}")
-                                        with c2:
-                                            if st.form_submit_button("Cancel"):
-                                                st.session_state[f"phemex_editing_{account['id']}"] = False
-                                                st.rerun()
-                                st.divider()
+                        p_accounts_df = pd.DataFrame(p_accounts)
+                        p_accounts_df['account_name'] = p_accounts_df['account_name'].fillna('').replace('', 'Unnamed Account')
+                        p_accounts_df['api_masked'] = _mask_keys(p_accounts_df['api_key'])
+                        p_event = st.dataframe(
+                            p_accounts_df[['account_name', 'user_email', 'created_at', 'total_trades', 'api_masked']],
+                            hide_index=True,
+                            use_container_width=True,
+                            on_select="rerun",
+                            selection_mode="single-row",
+                            key="admin_phemex_accounts_table",
+                            column_config={
+                                'account_name': st.column_config.TextColumn("Account"),
+                                'user_email': st.column_config.TextColumn("Owner"),
+                                'created_at': st.column_config.DatetimeColumn("Created"),
+                                'total_trades': st.column_config.NumberColumn("Total Trades"),
+                                'api_masked': st.column_config.TextColumn("API Key"),
+                            }
+                        )
+                        
+                        p_selected_rows = p_event.selection.rows
+                        if not p_selected_rows or p_selected_rows[0] >= len(p_accounts):
+                            st.caption("Select an account to edit or delete it")
+                        else:
+                            account = p_accounts[p_selected_rows[0]]
+                            ui_state = SessionManager.account_ui_state(account['id'], 'phemex')
+                            col1, col2, col3 = st.columns([2, 1, 1])
+                            with col1:
+                                st.write(f"**{account.get('account_name') or 'Unnamed Account'}** - {account.get('user_email', '')}")
+                            # Actions (Edit if available, Delete with admin or fallback)
+                            with col2:
+                                if hasattr(db, 'update_phemex_account'):
+                                    if st.button("Edit", key=f"phemex_edit_{account['id']}", use_container_width=True):
+                                        ui_state['edit'] = True
+                                        st.rerun(scope="fragment")
+                            with col3:
+                                if st.button("Delete", key=f"phemex_delete_{account['id']}", type="secondary", use_container_width=True):
+                                    deleted = False
+                                    try:
+                                        if hasattr(db, 'delete_phemex_account_admin'):
+                                            deleted = db.delete_phemex_account_admin(account['id'])
+                                        else:
+                                            deleted = db.delete_phemex_account(account['id'], account.get('user_email'))
+                                    except Exception as de:
+                                        logging.error(f"Delete Phemex account failed: {de}")
+                                    if deleted:
+                                        clear_account_caches(account.get('user_email'))
+                                        SessionManager.flash("Phemex account deleted!")
+                                        st.rerun(scope="fragment")
+                            # Edit form (only if method exists)
+                            if ui_state['edit'] and hasattr(db, 'update_phemex_account'):
+                                with st.form(f"phemex_edit_form_{account['id']}"):
+                                    new_name = st.text_input("Account Name", value=account.get('account_name', '') or '')
+                                    new_api_key = st.text_input("API Key", value=account.get('api_key', '') or '')
+                                    new_secret = st.text_input("Secret Key", value=account.get('secret_key', '') or '', type="password")
+                                    c1, c2 = st.columns(2)
+                                    with c1:
+                                        if st.form_submit_button("Save", type="primary"):
+                                            try:
+                                                if db.update_phemex_account(account['id'], new_api_key, new_secret, new_name):
+                                                    clear_account_caches(account.get('user_email'))
+                                                    SessionManager.flash("Account updated!")
+                                                    ui_state['edit'] = False
+                                                    st.rerun(scope="fragment")
+                                                else:
+                                                    st.error("Failed to update account")
+                                            except Exception as ue:
+                                                st.error(f"Update error: {ue}")
+                                    with c2:
+                                        if st.form_submit_button("Cancel"):
+                                            ui_state['edit'] = False
+                                            st.rerun(scope="fragment")
                     else:
                         st.info("📝 No Phemex accounts configured yet")
                 except Exception as e:
@@ -593,36 +875,18 @@ class AdminDashboard:
         st.subheader("📊 Trading Statistics")
         
         try:
-            db = Database()
+            db = get_db()
             binance_tab, phemex_tab = st.tabs(["🔶 Binance", "🔴 Phemex"])
 
             # BINANCE TAB
             with binance_tab:
                 try:
-                    accounts = db.get_all_binance_accounts() or []
+                    all_trades = _cached_all_account_trades()
                 except Exception as e:
-                    logging.error(f"Failed to load Binance accounts: {e}")
-                    accounts = []
+                    logging.error(f"Failed to load Binance trades: {e}")
+                    all_trades = []
                 
-                all_trades = []
-                name_by_id = {}
-                for acc in accounts:
-                    acc_id = acc.get('id')
-                    name_by_id[acc_id] = acc.get('account_name') or 'Unnamed Account'
-                    try:
-                        trades = db.get_account_trades(acc_id) or []
-                    except Exception as te:
-                        logging.error(f"Failed to load trades for Binance account {acc_id}: {te}")
-                        trades = []
-                    for t in trades:
-                        t['account_id'] = acc_id
-                        t['account_name'] = name_by_id[acc_id]
-                    all_trades.extend(trades)
-                
-                if not all_trades:
-                    st.info("📝 No Binance trades found.")
-                else:
-                    UserDashboard._display_trades_table(all_trades, "Binance", show_account_column=True)
+                UserDashboard._display_trades_table(pd.DataFrame(all_trades), "Binance", show_account_column=True)
 
             # PHEMEX TAB
             with phemex_tab:
@@ -635,19 +899,16 @@ class AdminDashboard:
                 # Map account_id to account_name if available
                 name_by_id = {}
                 try:
-                    phemex_accounts = db.get_all_phemex_accounts() or []
+                    phemex_accounts = _cached_all_phemex_accounts()
                     name_by_id = {a.get('id'): (a.get('account_name') or 'Unnamed Account') for a in phemex_accounts}
                 except Exception as ae:
                     logging.warning(f"get_all_phemex_accounts unavailable or failed: {ae}")
                     name_by_id = {}
                 
-                for t in phemex_trades:
-                    t['account_name'] = name_by_id.get(t.get('account_id'), 'Unknown Account')
-                
-                if not phemex_trades:
-                    st.info("📝 No Phemex trades found.")
-                else:
-                    UserDashboard._display_trades_table(phemex_trades, "Phemex", show_account_column=True)
+                phemex_df = pd.DataFrame(phemex_trades)
+                if not phemex_df.empty:
+                    phemex_df['account_name'] = phemex_df['account_id'].map(name_by_id).fillna('Unknown Account')
+                UserDashboard._display_trades_table(phemex_df, "Phemex", show_account_column=True)
         except Exception as e:
             st.error(f"Error loading trading statistics: {e}")
             logging.error(f"Trading statistics error: {e}")
@@ -664,7 +925,7 @@ class UserDashboard:
         # Show server info for users
         col1, = st.columns(1)
         with col1:
-            st.info(f"**Server IP**: 208.77.246.15")
+            st.info(f"**Server IP**: {server_ip()}")
         
         st.markdown("---")
         
@@ -703,29 +964,25 @@ class UserDashboard:
         st.subheader(" My Trading Accounts")
         
         try:
-            db = Database()
-            # accounts = db.get_user_accounts(st.session_state.user_data.email)
+            db = get_db()
+            user_email = st.session_state.user_data.email
+            # accounts = db.get_user_accounts(user_email)
             
             # Add new account form with exchange selection
             with st.expander("➕ Add New Trading Account"):
                 st.markdown("### 🔗 Select Exchange")
                 
                 # Exchange selection dropdown
-                exchange_options = {
-                    "binance": "Binance",
-                    "phemex": "Phemex"
-                }
-                
                 selected_exchange = st.selectbox(
                     "Choose Exchange:",
-                    options=list(exchange_options.keys()),
-                    format_func=lambda x: exchange_options[x],
+                    options=_EXCHANGE_KEYS,
+                    format_func=_EXCHANGE_OPTIONS.__getitem__,
                     index=0  # Default to Binance
                 )
                 
                 # Show warning for non-supported exchanges
                 if selected_exchange not in ["binance", "phemex"]:
-                    st.warning(f" {exchange_options[selected_exchange]} integration is coming soon!")
+                    st.warning(f" {_EXCHANGE_OPTIONS[selected_exchange]} integration is coming soon!")
                     st.info("For now, please use Binance or Phemex exchanges which are fully supported.")
                 elif selected_exchange == "binance":
                     # Binance setup help
@@ -744,37 +1001,7 @@ class UserDashboard:
                     
                     # Detailed PDF guide button
                     st.markdown("---")
-                    col1, = st.columns(1)
-                    pdf_path = os.path.join(os.path.dirname(__file__), "binance.pdf")
-
-                    if os.path.exists(pdf_path):
-                        try:
-                            # Read PDF file as bytes for download
-                            with open(pdf_path, 'rb') as pdf_file:
-                                pdf_bytes = pdf_file.read()
-
-                            st.success("📄 PDF Guide Available - Download to view complete instructions with images")
-                            with col1:
-                                # File info
-                                file_size_mb = len(pdf_bytes) / (1024 * 1024)
-                                st.markdown(f"**📋 File Size:** {file_size_mb:.2f} MB")
-                                st.markdown("**📄 Format:** PDF with images and screenshots")
-
-                                # Primary download button with unique key
-                                st.download_button(
-                                    label="📥 Download Complete Guide",
-                                    data=pdf_bytes,
-                                    file_name="binance.pdf",
-                                    mime="application/pdf",
-                                    use_container_width=True,
-                                    type="primary",
-                                    help="Downloads the complete PDF guide with step-by-step instructions",
-                                    key="download_pdf_primary"
-                                )
-
-                                st.caption("💡 **Tip:** Open with your default PDF reader for best viewing experience")
-                        except Exception as e:
-                            st.info(f"Error loading PDF guide: {e}")
+                    UserDashboard._show_pdf_guide("binance.pdf", "📥 Download Complete Guide", "download_pdf_primary")
                     st.markdown("---")
                     st.markdown("### Add Binance Account")
 
@@ -799,35 +1026,25 @@ class UserDashboard:
                             if api_key and secret_key:
                                 # Validate credentials
                                 try:
-                                    test_client = BinanceClient(api_key=api_key, secret_key=secret_key)
-                                    if test_client.test_connection():
-                                        # Try to add with exchange type, fallback to old method
-                                        try:
-                                            if db.add_binance_account(
-                                                st.session_state.user_data.email, 
-                                                api_key, 
-                                                secret_key, 
-                                                account_name,
-                                                selected_exchange
-                                            ):
-                                                st.success("✅ Binance account added successfully!")
-                                                time.sleep(1)
-                                                st.rerun()
-                                            else:
-                                                st.error("Failed to add account to database")
-                                        except Exception:
-                                            # Fallback to old method without exchange type
-                                            if db.add_binance_account(
-                                                st.session_state.user_data.email, 
-                                                api_key, 
-                                                secret_key, 
-                                                account_name
-                                            ):
-                                                st.success(" Binance account added successfully!")
-                                                time.sleep(1)
-                                                st.rerun()
-                                            else:
-                                                st.error("Failed to add account to database")
+                                    with st.spinner("Validating credentials..."):
+                                        credentials_valid = _validate_binance_credentials(
+                                            _credentials_hash(api_key, secret_key), api_key, secret_key
+                                        )
+                                    if credentials_valid:
+                                        # Only validated keys are stored; the bot mirrors
+                                        # onto every account row as soon as it exists
+                                        if db.add_binance_account(
+                                            user_email, 
+                                            api_key, 
+                                            secret_key, 
+                                            account_name,
+                                            selected_exchange
+                                        ):
+                                            clear_account_caches(user_email)
+                                            SessionManager.flash("✅ Binance account added successfully!")
+                                            st.rerun()
+                                        else:
+                                            st.error("Failed to add account to database")
                                     else:
                                         st.error(" Invalid Binance API credentials")
                                 except Exception as e:
@@ -854,37 +1071,7 @@ class UserDashboard:
                         """)
                     st.markdown("---")
                      # Detailed PDF guide button
-                    col1, = st.columns(1)
-                    pdf_path = os.path.join(os.path.dirname(__file__), "binance.pdf")
-
-                    if os.path.exists(pdf_path):
-                        try:
-                            # Read PDF file as bytes for download
-                            with open(pdf_path, 'rb') as pdf_file:
-                                pdf_bytes = pdf_file.read()
-
-                            st.success("📄 PDF Guide Available - Download to view complete instructions with images")
-                            with col1:
-                                # File info
-                                file_size_mb = len(pdf_bytes) / (1024 * 1024)
-                                st.markdown(f"**📋 File Size:** {file_size_mb:.2f} MB")
-                                st.markdown("**📄 Format:** PDF with images and screenshots")
-
-                                # Primary download button with unique key
-                                st.download_button(
-                                    label="Download Step by Step Phemex Guide",
-                                    data=pdf_bytes,
-                                    file_name="phemex.pdf",
-                                    mime="application/pdf",
-                                    use_container_width=True,
-                                    type="primary",
-                                    help="Downloads the complete PDF guide with step-by-step instructions",
-                                    key="Download Step by Step Phemex Guide"
-                                )
-
-                                st.caption("💡 **Tip:** Open with your default PDF reader for best viewing experience")
-                        except Exception as e:
-                            st.info(f"Error loading PDF guide: {e}")
+                    UserDashboard._show_pdf_guide("phemex.pdf", "Download Step by Step Phemex Guide", "Download Step by Step Phemex Guide")
                     st.markdown("---")
                     st.markdown("### Add Phemex Account")
                     
@@ -912,6 +1099,7 @@ class UserDashboard:
                             if api_key and secret_key:
                                 # Validate Phemex credentials
                                 try:
+                                    from binance_config import PhemexClient
                                     test_client = PhemexClient(api_key=api_key, api_secret=secret_key)
                                     # Try the simplified connection test first
                                     connection_success = test_client.test_connection_simple()
@@ -922,16 +1110,14 @@ class UserDashboard:
                                     
                                     if connection_success:
                                         if db.add_phemex_account(
-                                            st.session_state.user_data.email, 
+                                            user_email, 
                                             api_key, 
                                             secret_key, 
                                             account_name
                                         ):
-                                            st.success(" Phemex account added successfully!")
-                                            st.info("Refreshing page to show new account...")
+                                            SessionManager.flash(" Phemex account added successfully!")
                                             # Trigger refresh
-                                            SessionManager.trigger_accounts_refresh()
-                                            time.sleep(2)
+                                            SessionManager.trigger_accounts_refresh(user_email)
                                             st.rerun()
                                         else:
                                             st.error("Failed to add account to database")
@@ -949,7 +1135,7 @@ class UserDashboard:
                 phemex_accounts = []
                 
                 try:
-                    binance_accounts = db.get_user_accounts(st.session_state.user_data.email) or []
+                    binance_accounts = _cached_user_accounts(user_email) or []
                     logging.info(f"Successfully loaded {len(binance_accounts)} Binance accounts")
                 except Exception as e:
                     logging.error(f"Error fetching Binance accounts: {e}")
@@ -957,7 +1143,7 @@ class UserDashboard:
                     binance_accounts = []
                 
                 try:
-                    phemex_accounts = db.get_user_phemex_accounts(st.session_state.user_data.email)
+                    phemex_accounts = _cached_user_phemex_accounts(user_email)
                     logging.info(f"Phemex accounts result type: {type(phemex_accounts)}")
                     logging.info(f"Phemex accounts result: {phemex_accounts}")
                     
@@ -999,49 +1185,72 @@ class UserDashboard:
                     st.markdown("---")
                     st.markdown("### 📊 My Trading Accounts")
                     
+                    statuses = None
+                    if binance_accounts and st.button("🔄 Check all connections", key="check_all_connections"):
+                        with st.spinner("Checking connections..."):
+                            statuses = binance_connection_statuses(binance_accounts)
+                    
+                    # One table for every account; the action buttons are only
+                    # rendered for the row the user selects
+                    rows = []
                     for account in all_user_accounts:
+                        row = {
+                            "Account": account.get('account_name') or 'Unnamed Account',
+                            "Exchange": _EXCHANGE_OPTIONS.get(account['exchange_type'], f"🔗 {account['exchange_type'].title()}"),
+                            "Added": safe_datetime_to_string(account.get('created_at')),
+                            "Total Trades": account.get('total_trades', 0),
+                        }
+                        if statuses is not None:
+                            if account['exchange_type'] == 'binance' and account['id'] in statuses:
+                                row["Status"] = "Connected" if statuses[account['id']] else "Disconnected"
+                            else:
+                                row["Status"] = "N/A"
+                        rows.append(row)
+                    accounts_df = pd.DataFrame(rows)
+                    event = st.dataframe(
+                        accounts_df,
+                        use_container_width=True,
+                        hide_index=True,
+                        on_select="rerun",
+                        selection_mode="single-row",
+                        key="user_accounts_table"
+                    )
+                    
+                    selected_rows = event.selection.rows
+                    if not selected_rows or selected_rows[0] >= len(all_user_accounts):
+                        st.caption("Select an account to view its details or delete it")
+                    else:
+                        account = all_user_accounts[selected_rows[0]]
                         try:
-                            # Get exchange type and display name
-                            exchange_type = account.get('exchange_type', 'binance')
-                            exchange_name = exchange_options.get(exchange_type, f"🔗 {exchange_type.title()}")
+                            exchange_type = account['exchange_type']
+                            account_display_name = account.get('account_name') or 'Unnamed Account'
                             
-                            with st.container():
-                                col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
-                                
-                                with col1:
-                                    account_display_name = account.get('account_name') or 'Unnamed Account'
-                                    st.write(f"**{account_display_name}**")
-                                    created_at_safe = safe_datetime_to_string(account.get('created_at'))
-                                    st.caption(f"Exchange: {exchange_name} • Added: {created_at_safe}")
-                                
+                            col1, col2, col3 = st.columns([2, 1, 1])
+                            with col1:
+                                st.write(f"**{account_display_name}**")
+                            if exchange_type == 'binance':
                                 with col2:
-                                    total_trades = account.get('total_trades', 0)
-                                    st.metric("Total Trades", total_trades)
-                                if exchange_type == 'binance':
-                                    with col3:
-                                        if st.button("Details",  key=f"details_{exchange_type}_{account   ['id']}"):
-                                            st.session_state.selected_account =     account['id']
-                                            st.session_state.   selected_exchange_type =   exchange_type
-                                            st.session_state.   show_account_details = True
+                                    if st.button("Details", key=f"details_{exchange_type}_{account['id']}"):
+                                        st.session_state.selected_account = account['id']
+                                        st.session_state.selected_exchange_type = exchange_type
+                                        st.session_state.show_account_details = True
+                                        st.rerun()
+                            
+                            with col3:
+                                if st.button("Delete", key=f"del_{exchange_type}_{account['id']}", type="secondary"):
+                                    # Handle deletion based on exchange type
+                                    if exchange_type == 'binance':
+                                        if db.delete_account(account['id'], user_email):
+                                            clear_account_caches(user_email)
+                                            SessionManager.flash("Binance account deleted!")
                                             st.rerun()
-                                
-                                with col4:
-                                    if st.button("Delete", key=f"del_{exchange_type}_{account['id']}", type="secondary"):
-                                        # Handle deletion based on exchange type
-                                        if exchange_type == 'binance':
-                                            if db.delete_account(account['id'], st.session_state.user_data.email):
-                                                st.success("Binance account deleted!")
-                                                time.sleep(1)
-                                                st.rerun()
-                                        elif exchange_type == 'phemex':
-                                            if db.delete_phemex_account(account['id'], st.session_state.user_data.email):
-                                                st.success("Phemex account deleted!")
-                                                time.sleep(1)
-                                                st.rerun()
-                                            else:
-                                                st.error("Failed to delete Phemex account")
-                                
-                                st.divider()
+                                    elif exchange_type == 'phemex':
+                                        if db.delete_phemex_account(account['id'], user_email):
+                                            clear_account_caches(user_email)
+                                            SessionManager.flash("Phemex account deleted!")
+                                            st.rerun()
+                                        else:
+                                            st.error("Failed to delete Phemex account")
                         except Exception as e:
                             logging.error(f"Error displaying account {account.get('id', 'unknown')}: {e}")
                             st.error(f"Error displaying account: {e}")
@@ -1058,6 +1267,44 @@ class UserDashboard:
             logging.error(f"Account management error: {e}")
 
 
+    @staticmethod
+    def _show_pdf_guide(file_name, label, key):
+        """Download button for the setup guide PDF, loaded only once the user asks for it"""
+        # The guide is a few MB; reruns of the add-account form skip it until toggled on
+        if not st.toggle("📄 Show PDF Guide", key=f"show_guide_{key}"):
+            return
+        
+        pdf_path = os.path.join(os.path.dirname(__file__), file_name)
+        if not os.path.exists(pdf_path):
+            st.info("PDF guide is not available")
+            return
+        
+        try:
+            # Read PDF file as bytes for download, once per file version
+            pdf_bytes = _load_guide_pdf(pdf_path, os.path.getmtime(pdf_path))
+            
+            st.success("📄 PDF Guide Available - Download to view complete instructions with images")
+            # File info
+            file_size_mb = len(pdf_bytes) / (1024 * 1024)
+            st.markdown(f"**📋 File Size:** {file_size_mb:.2f} MB")
+            st.markdown("**📄 Format:** PDF with images and screenshots")
+            
+            # Primary download button with unique key
+            st.download_button(
+                label=label,
+                data=pdf_bytes,
+                file_name=file_name,
+                mime="application/pdf",
+                use_container_width=True,
+                type="primary",
+                help="Downloads the complete PDF guide with step-by-step instructions",
+                key=key
+            )
+            
+            st.caption("💡 **Tip:** Open with your default PDF reader for best viewing experience")
+        except Exception as e:
+            st.info(f"Error loading PDF guide: {e}")
+
     @staticmethod
     def _show_account_details() -> None:
         """Show detailed account information and trading history"""
@@ -1072,17 +1319,23 @@ class UserDashboard:
                 st.rerun()
         
         try:
-            db = Database()
+            db = get_db()
+            user_email = st.session_state.user_data.email
             
-            # Get account information
-            account_info = db.get_account_by_id(account_id, st.session_state.user_data.email)
+            # Account row, trade counts and filter values in one cached load,
+            # re-read only when the trades etag changes or the account is edited
+            etag = db.get_trades_etag(account_id)
+            bundle = _cached_account_bundle(account_id, user_email, etag)
+            ui_state = SessionManager.account_ui_state(account_id)
             
-            if not account_info:
+            if not bundle:
                 st.error("Account not found or access denied")
                 st.session_state.show_account_details = False
                 st.rerun()
                 return
             
+            account_info = bundle['info']
+            
             # Page title
             st.title(f"Account Details: {account_info.get('account_name', 'Unnamed Account')}")
             
@@ -1094,157 +1347,58 @@ class UserDashboard:
             
             with col2:
                 exchange_type = account_info.get('exchange_type', 'binance')
-                exchange_icons = {'binance': '🔶', 'bybit': '🟡', 'phemex': '🔴'}
-                st.metric("🔗 Exchange", f"{exchange_icons.get(exchange_type, '🔗')} {exchange_type.title()}")
+                st.metric("🔗 Exchange", f"{_EXCHANGE_ICONS.get(exchange_type, '🔗')} {exchange_type.title()}")
             
             with col3:
                 st.metric("📅 Created", safe_datetime_to_string(account_info.get('created_at', 'N/A')))
             
             with col4:
-                # Account status (could be enhanced with real-time balance check)
-                try:
-                    test_client = BinanceClient(
-                        api_key=account_info['api_key'],
-                        secret_key=account_info['secret_key']
-                    )
-                    connection_status = "Connected" if test_client.test_connection() else "Disconnected"
-                    st.metric("Status", connection_status)
-                except Exception:
-                    st.metric("Status", "Unknown")
+                # Probing Binance is a network round trip, so the page renders
+                # without it until the user asks for the status
+                if ui_state.get('check_status'):
+                    try:
+                        connected = binance_connection_status(account_info['api_key'], account_info['secret_key'])
+                        connection_status = "Connected" if connected else "Disconnected"
+                        st.metric("Status", connection_status)
+                    except Exception:
+                        st.metric("Status", "Unknown")
+                else:
+                    st.metric("Status", "Not checked")
+                    if st.button("Check status", key=f"check_status_{account_id}"):
+                        ui_state['check_status'] = True
+                        st.rerun()
             
             st.markdown("---")
             
             # Trading history section
             st.subheader("Trading History")
             
-            # Get trades for this account
-            trades = db.get_account_trades(account_id)
+            counts = bundle['counts']
             
-            if trades:
+            if counts['total']:
                 # Summary metrics
                 st.markdown("### Trading Summary")
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    st.metric("Total Orders", len(trades))
+                    st.metric("Total Orders", counts['total'])
                 
                 with col2:
-                    buy_orders = len([t for t in trades if t.get('side') == 'BUY'])
-                    st.metric("Buy Orders", buy_orders)
+                    st.metric("Buy Orders", counts['buy'])
                 
                 with col3:
-                    sell_orders = len([t for t in trades if t.get('side') == 'SELL'])
-                    st.metric("Sell Orders", sell_orders)
+                    st.metric("Sell Orders", counts['sell'])
                 
                 with col4:
-                    successful_trades = len([t for t in trades if t.get('status') in ['FILLED', 'MIRRORED']])
-                    st.metric("Successful", successful_trades)
+                    st.metric("Successful", counts['filled'] + counts['mirrored'])
                 
                 st.markdown("---")
                 
                 # Recent trades table
                 st.markdown("### Recent Trades")
                 
-                # Filter options
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    symbols = list(set([trade.get('symbol', 'N/A') for trade in trades]))
-                    selected_symbol = st.selectbox("Filter by Symbol", ["All"] + symbols)
-                
-                with col2:
-                    sides = ['All', 'BUY', 'SELL']
-                    selected_side = st.selectbox("Filter by Side", sides)
-                
-                with col3:
-                    statuses = list(set([trade.get('status', 'N/A') for trade in trades]))
-                    selected_status = st.selectbox("Filter by Status", ["All"] + statuses)
-                
-                # Apply filters
-                filtered_trades = trades
-                if selected_symbol != "All":
-                    filtered_trades = [t for t in filtered_trades if t.get('symbol') == selected_symbol]
-                if selected_side != "All":
-                    filtered_trades = [t for t in filtered_trades if t.get('side') == selected_side]
-                if selected_status != "All":
-                    filtered_trades = [t for t in filtered_trades if t.get('status') == selected_status]
-                
-                # Display filtered trades
-                if filtered_trades:
-                    # Sort by most recent first
-                    filtered_trades.sort(key=lambda x: x.get('trade_time', ''), reverse=True)
-                    
-                    # Pagination
-                    trades_per_page = 10
-                    total_pages = (len(filtered_trades) - 1) // trades_per_page + 1
-                    
-                    if total_pages > 1:
-                        page = st.selectbox(f"Page (Total: {total_pages})", range(1, total_pages + 1))
-                        start_idx = (page - 1) * trades_per_page
-                        end_idx = start_idx + trades_per_page
-                        display_trades = filtered_trades[start_idx:end_idx]
-                    else:
-                        display_trades = filtered_trades
-                    
-                    # Display trades
-                    for trade in display_trades:
-                        with st.container():
-                            col1, col2, col3, col4, col5, col6 = st.columns([2, 1, 1, 1, 1, 2])
-                            
-                            with col1:
-                                symbol = trade.get('symbol', 'N/A')
-                                st.write(f"**{symbol}**")
-                                st.caption(f"Order ID: {trade.get('order_id', 'N/A')}")
-                            
-                            with col2:
-                                side = trade.get('side', 'N/A')
-                                st.write(f"{side}")
-                            
-                            
-                            with col3:
-                                quantity = trade.get('quantity', 0)
-                                st.write(f"{quantity}")
-                            
-                            with col4:
-                                price = trade.get('price')
-                                if price:
-                                    st.write(f"${price}")
-                                else:
-                                    st.write("Market")
-                            
-                            with col5:
-                                pnl = trade.get('pnl', '0')
-                                #round to 2 decimal places
-                                if not pnl or pnl == 'None':
-                                    pnl = 0
-                                pnl = round(float(pnl), 3)
-                                st.write(f"{pnl}")
-                                
-                                trade_time = trade.get('trade_time', 'N/A')
-                                formatted_time = safe_datetime_to_string(trade_time)
-                                if formatted_time != 'N/A' and len(formatted_time) >= 10:
-                                    # Convert to short format for display (MM/DD HH:MM)
-                                    try:
-                                        # Extract month/day and time from YYYY-MM-DD HH:MM:SS format
-                                        date_part = formatted_time[5:10].replace('-', '/')  # MM/DD
-                                        time_part = formatted_time[11:16] if len(formatted_time) > 11 else ""  # HH:MM
-                                        short_display = f"{date_part} {time_part}".strip()
-                                        st.caption(f" {short_display}")
-                                    except:
-                                        st.caption(f" {formatted_time}")
-                                else:
-                                    st.caption("N/A")
-                            with col6:
-                                st.write(f"${trade.get('start_balance', 0)} ->")
-                                st.write(f"${trade.get('end_balance', 0)}")
-                            st.divider()
-                    
-                    # Show pagination info
-                    if total_pages > 1:
-                        st.caption(f"Showing {len(display_trades)} of {len(filtered_trades)} trades")
-                        
-                else:
-                    st.info("📝 No trades match the selected filters")
+                # Filters and pages rerun only this fragment, not the whole page
+                UserDashboard._show_recent_trades(account_id, etag, bundle['symbols'], bundle['statuses'])
                     
             else:
                 st.info("📝 No trading activity found for this account")
@@ -1265,11 +1419,9 @@ class UserDashboard:
             with col1:
                 if st.button("🔄 Test Connection", use_container_width=True):
                     try:
-                        test_client = BinanceClient(
-                            api_key=account_info['api_key'],
-                            secret_key=account_info['secret_key']
-                        )
-                        if test_client.test_connection():
+                        # An explicit test always goes to Binance and refreshes the cached status
+                        ui_state['check_status'] = True
+                        if binance_connection_status(account_info['api_key'], account_info['secret_key'], refresh=True):
                             st.success(" Connection successful!")
                         else:
                             st.error("Connection failed!")
@@ -1278,16 +1430,16 @@ class UserDashboard:
             
             with col2:
                 if st.button(" Edit Account", use_container_width=True):
-                    st.session_state[f"editing_user_{account_id}"] = True
+                    ui_state['edit'] = True
                     st.rerun()
             
             with col3:
                 if st.button("Delete Account", use_container_width=True, type="secondary"):
-                    st.session_state[f"confirming_delete_{account_id}"] = True
+                    ui_state['confirm_delete'] = True
                     st.rerun()
             
             # Edit form
-            if st.session_state.get(f"editing_user_{account_id}", False):
+            if ui_state['edit']:
                 with st.form(f"edit_user_account_{account_id}"):
                     st.markdown("###  Edit Account")
                     
@@ -1299,20 +1451,20 @@ class UserDashboard:
                     with col1:
                         if st.form_submit_button("💾 Save Changes", type="primary"):
                             if db.update_binance_account(account_id, new_api_key, new_secret, new_name):
-                                st.success(" Account updated successfully!")
-                                st.session_state[f"editing_user_{account_id}"] = False
-                                time.sleep(1)
+                                clear_account_caches(user_email)
+                                SessionManager.flash(" Account updated successfully!")
+                                ui_state['edit'] = False
                                 st.rerun()
                             else:
                                 st.error(" Failed to update account")
                     
                     with col2:
                         if st.form_submit_button(" Cancel"):
-                            st.session_state[f"editing_user_{account_id}"] = False
+                            ui_state['edit'] = False
                             st.rerun()
             
             # Delete confirmation
-            if st.session_state.get(f"confirming_delete_{account_id}", False):
+            if ui_state['confirm_delete']:
                 st.warning(" **Confirm Account Deletion**")
                 st.markdown(f"Are you sure you want to delete **{account_info.get('account_name', 'this account')}**?")
                 st.markdown("This action cannot be undone and will remove all trading history.")
@@ -1320,37 +1472,109 @@ class UserDashboard:
                 col1, col2, col3 = st.columns(3)
                 with col1:
                     if st.button(" Yes, Delete", type="primary"):
-                        if db.delete_account(account_id, st.session_state.user_data.email):
-                            st.success(" Account deleted successfully!")
-                            st.session_state[f"confirming_delete_{account_id}"] = False
+                        if db.delete_account(account_id, user_email):
+                            clear_account_caches(user_email)
+                            SessionManager.flash(" Account deleted successfully!")
+                            st.session_state.account_ui.get('binance', {}).pop(account_id, None)
                             st.session_state.show_account_details = False
                             st.session_state.selected_account = None
-                            time.sleep(1)
                             st.rerun()
                         else:
                             st.error(" Failed to delete account")
                 
                 with col2:
                     if st.button(" Cancel"):
-                        st.session_state[f"confirming_delete_{account_id}"] = False
+                        ui_state['confirm_delete'] = False
                         st.rerun()
                         
         except Exception as e:
             st.error(f"Error loading account details: {e}")
             logging.error(f"Account details error: {e}")
 
+    @staticmethod
+    @st.fragment
+    def _show_recent_trades(account_id, etag, symbols, statuses) -> None:
+        """Filterable, paginated trade table for the account details page"""
+        try:
+            # Filter options
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                selected_symbol = st.selectbox("Filter by Symbol", ["All"] + symbols)
+
+            with col2:
+                sides = ['All', 'BUY', 'SELL']
+                selected_side = st.selectbox("Filter by Side", sides)
+
+            with col3:
+                selected_status = st.selectbox("Filter by Status", ["All"] + statuses)
+
+            # Filtering, ordering and paging happen in SQL; "All" means no filter
+            trades_per_page = 10
+            filters = tuple(
+                None if value == "All" else value
+                for value in (selected_symbol, selected_side, selected_status)
+            )
+            display_trades, total_matching = _cached_trade_page(
+                account_id, etag, *filters, trades_per_page, 0
+            )
+
+            # Display filtered trades
+            if total_matching:
+                # Pagination
+                total_pages = (total_matching - 1) // trades_per_page + 1
+
+                if total_pages > 1:
+                    page = st.selectbox(f"Page (Total: {total_pages})", range(1, total_pages + 1))
+                    if page > 1:
+                        display_trades, total_matching = _cached_trade_page(
+                            account_id, etag, *filters, trades_per_page, (page - 1) * trades_per_page
+                        )
+
+                # Display trades as one table, built column by column
+                trades_df = pd.DataFrame(display_trades).reindex(columns=[
+                    'symbol', 'side', 'quantity', 'price', 'pnl',
+                    'trade_time', 'start_balance', 'end_balance',
+                ])
+                price = trades_df['price']
+                table = pd.DataFrame({
+                    "Symbol": trades_df['symbol'].fillna('N/A'),
+                    # From the raw values: a NULL on the page would upcast the frame's
+                    # order_id column to float64 and mangle 19-digit Binance IDs
+                    "Order ID": pd.Series(
+                        [trade.get('order_id') for trade in display_trades], dtype=object
+                    ).map(lambda value: 'N/A' if value is None or pd.isna(value) else str(value)),
+                    "Side": trades_df['side'].fillna('N/A'),
+                    "Quantity": trades_df['quantity'].fillna(0).astype(str),
+                    "Price": ('$' + price.astype(str)).where(price.notna() & (price != 0), 'Market'),
+                    "PnL": pd.to_numeric(trades_df['pnl'], errors='coerce').fillna(0).round(3),
+                    "Time": pd.to_datetime(trades_df['trade_time'], errors='coerce').dt.strftime('%m/%d %H:%M').fillna('N/A'),
+                    "Balance": '$' + trades_df['start_balance'].fillna(0).astype(str) + ' -> $' + trades_df['end_balance'].fillna(0).astype(str),
+                })
+                st.dataframe(table, use_container_width=True, hide_index=True)
+
+                # Show pagination info
+                if total_pages > 1:
+                    st.caption(f"Showing {len(display_trades)} of {total_matching} trades")
+
+            else:
+                st.info("📝 No trades match the selected filters")
+        except Exception as e:
+            st.error(f"Error loading trades: {e}")
+            logging.error(f"Recent trades error: {e}")
+
     @staticmethod
     def _show_user_trades() -> None:
         """Show user's trading history with separate tabs for different exchanges"""
         st.subheader("📊 My Trading History")
         
         try:
-            db = Database()
+            db = get_db()
             user_email = st.session_state.user_data.email
             
             # Get user's accounts to filter trades
-            binance_accounts = db.get_user_accounts(user_email) or []
-            phemex_accounts = db.get_user_phemex_accounts(user_email) or []
+            binance_accounts = _cached_user_accounts(user_email) or []
+            phemex_accounts = _cached_user_phemex_accounts(user_email) or []
             
             # Create tabs for different exchanges
             tab1, tab2, tab3 = st.tabs(["🔶 Binance Trades", "🔴 Phemex Trades", "📊 Overall Summary"])
@@ -1412,7 +1636,7 @@ class UserDashboard:
                 trade['account_id'] = selected_account
             all_binance_trades = account_trades
         
-        UserDashboard._display_trades_table(all_binance_trades, "Binance", show_account_column=(selected_account == 'all'))
+        UserDashboard._display_trades_table(pd.DataFrame(all_binance_trades), "Binance", show_account_column=(selected_account == 'all'))
 
     @staticmethod
     def _show_phemex_trades(db, phemex_accounts, user_email):
@@ -1458,7 +1682,7 @@ class UserDashboard:
                 for trade in all_phemex_trades:
                     trade['account_name'] = account_name
             
-            UserDashboard._display_trades_table(all_phemex_trades, "Phemex", show_account_column=(selected_account == 'all'))
+            UserDashboard._display_trades_table(pd.DataFrame(all_phemex_trades), "Phemex", show_account_column=(selected_account == 'all'))
             
         except Exception as e:
             st.error(f"Error loading Phemex trades: {e}")
@@ -1470,51 +1694,48 @@ class UserDashboard:
         st.subheader("Overall Trading Summary")
         
         try:
-            # Get all trades from both exchanges
-            all_binance_trades = []
-            all_phemex_trades = []
-            
-            # Collect Binance trades
-            for account in binance_accounts:
-                account_trades = db.get_account_trades(account['id']) or []
-                for trade in account_trades:
-                    trade['exchange'] = 'Binance'
-                    trade['account_name'] = account['account_name'] or 'Unnamed Account'
-                all_binance_trades.extend(account_trades)
+            # Get all trades from both exchanges as DataFrames
+            binance_names = {account['id']: account['account_name'] or 'Unnamed Account' for account in binance_accounts}
+            binance_trades = [trade for account in binance_accounts for trade in (db.get_account_trades(account['id']) or [])]
+            binance_df = pd.DataFrame(binance_trades)
+            if not binance_df.empty:
+                binance_df['exchange'] = 'Binance'
+                binance_df['account_name'] = binance_df['account_id'].map(binance_names)
             
             # Collect Phemex trades
             try:
-                user_account_ids = [acc['id'] for acc in phemex_accounts]
-                phemex_trades = db.get_phemex_trades() or []
-                all_phemex_trades = [trade for trade in phemex_trades if trade.get('account_id') in user_account_ids]
-                
-                for trade in all_phemex_trades:
-                    trade['exchange'] = 'Phemex'
-                    account = next((acc for acc in phemex_accounts if acc['id'] == trade.get('account_id')), None)
-                    trade['account_name'] = account['account_name'] if account else 'Unknown Account'
+                phemex_names = {acc['id']: acc['account_name'] for acc in phemex_accounts}
+                phemex_df = pd.DataFrame(db.get_phemex_trades() or [])
+                if not phemex_df.empty:
+                    phemex_df = phemex_df[phemex_df['account_id'].isin(phemex_names)].copy()
+                    phemex_df['exchange'] = 'Phemex'
+                    phemex_df['account_name'] = phemex_df['account_id'].map(phemex_names).fillna('Unknown Account')
                     
             except Exception as e:
                 logging.error(f"Error loading Phemex trades for summary: {e}")
-                all_phemex_trades = []
+                phemex_df = pd.DataFrame()
+            
+            all_trades_df = pd.concat([binance_df, phemex_df], ignore_index=True)
             
             # Summary metrics
-            total_trades = len(all_binance_trades) + len(all_phemex_trades)
+            total_trades = len(all_trades_df)
             
             if total_trades > 0:
+                side_counts = all_trades_df['side'].value_counts()
+                
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
                     st.metric("Total Trades", total_trades)
                 
                 with col2:
-                    st.metric("Binance Trades", len(all_binance_trades))
+                    st.metric("Binance Trades", len(binance_df))
                 
                 with col3:
-                    st.metric("Phemex Trades", len(all_phemex_trades))
+                    st.metric("Phemex Trades", len(phemex_df))
                 
                 with col4:
-                    success_count = len([t for t in (all_binance_trades + all_phemex_trades) 
-                                       if t.get('status') in ['FILLED', 'MIRRORED']])
+                    success_count = int(all_trades_df['status'].isin(_OK_STATUSES).sum())
                     success_rate = (success_count / total_trades * 100) if total_trades > 0 else 0
                     st.metric("✅ Success Rate", f"{success_rate:.1f}%")
                 
@@ -1528,20 +1749,16 @@ class UserDashboard:
                     # Exchange distribution
                     exchange_data = {
                         'Exchange': ['Binance', 'Phemex'],
-                        'Trades': [len(all_binance_trades), len(all_phemex_trades)]
+                        'Trades': [len(binance_df), len(phemex_df)]
                     }
                     if exchange_data['Trades'][0] > 0 or exchange_data['Trades'][1] > 0:
                         st.bar_chart(data=exchange_data, x='Exchange', y='Trades')
                 
                 with col2:
                     # Side distribution
-                    all_trades = all_binance_trades + all_phemex_trades
-                    buy_count = len([t for t in all_trades if t.get('side') == 'BUY'])
-                    sell_count = len([t for t in all_trades if t.get('side') == 'SELL'])
-                    
                     side_data = {
                         'Side': ['BUY', 'SELL'],
-                        'Count': [buy_count, sell_count]
+                        'Count': [int(side_counts.get('BUY', 0)), int(side_counts.get('SELL', 0))]
                     }
                     if side_data['Count'][0] > 0 or side_data['Count'][1] > 0:
                         st.bar_chart(data=side_data, x='Side', y='Count')
@@ -1550,20 +1767,8 @@ class UserDashboard:
                 st.markdown("---")
                 st.subheader("Recent Activity (All Exchanges)")
                 
-                # Combine and sort all trades
-                combined_trades = []
-                for trade in all_binance_trades:
-                    trade['exchange'] = 'Binance'
-                    combined_trades.append(trade)
-                for trade in all_phemex_trades:
-                    trade['exchange'] = 'Phemex'
-                    combined_trades.append(trade)
-                
-                # Sort by trade time (most recent first)
-                combined_trades.sort(key=lambda x: x.get('trade_time', ''), reverse=True)
-                
-                # Show recent trades (limit to 20)
-                recent_trades = combined_trades[:20]
+                # Show the 20 most recent trades
+                recent_trades = all_trades_df.sort_values('trade_time', ascending=False, na_position='last').head(20)
                 UserDashboard._display_trades_table(recent_trades, "Combined", show_account_column=True, show_exchange_column=True)
                 
             else:
@@ -1581,171 +1786,100 @@ class UserDashboard:
             logging.error(f"Trading summary error: {e}")
 
     @staticmethod
-    def _display_trades_table(trades, exchange_name, show_account_column=False, show_exchange_column=False):
-        """Display trades in a formatted table with filtering options"""
+    def _display_trades_table(trades_df, exchange_name, show_account_column=False, show_exchange_column=False):
+        """Display a DataFrame of trades as one filtered table"""
         
-        if not trades:
+        if trades_df.empty:
             st.info(f"📝 No {exchange_name} trades found.")
             return
         
+        # Trade sources differ in which columns they carry; fill the missing ones
+        trades_df = trades_df.reindex(columns=trades_df.columns.union(_TRADE_TABLE_COLUMNS, sort=False))
+        
         # Filter options
         st.markdown("### Filter Options")
         col1, col2, col3, col4 = st.columns(4)
         
+        symbols = trades_df['symbol'].fillna('N/A')
+        statuses = trades_df['status'].fillna('N/A')
+        
         with col1:
-            symbols = list(set([trade.get('symbol', 'N/A') for trade in trades]))
-            selected_symbol = st.selectbox("Symbol", ["All"] + sorted(symbols), key=f"symbol_{exchange_name}")
+            selected_symbol = st.selectbox("Symbol", ["All"] + sorted(symbols.unique()), key=f"symbol_{exchange_name}")
         
         with col2:
             sides = ['All', 'BUY', 'SELL']
             selected_side = st.selectbox("Side", sides, key=f"side_{exchange_name}")
         
         with col3:
-            statuses = list(set([trade.get('status', 'N/A') for trade in trades]))
-            selected_status = st.selectbox("Status", ["All"] + sorted(statuses), key=f"status_{exchange_name}")
+            selected_status = st.selectbox("Status", ["All"] + sorted(statuses.unique()), key=f"status_{exchange_name}")
         
         with col4:
             limit_options = [10, 25, 50, 100, "All"]
             selected_limit = st.selectbox("Show", limit_options, index=1, key=f"limit_{exchange_name}")
         
         # Apply filters
-        filtered_trades = trades
+        mask = pd.Series(True, index=trades_df.index)
         if selected_symbol != "All":
-            filtered_trades = [t for t in filtered_trades if t.get('symbol') == selected_symbol]
+            mask &= symbols == selected_symbol
         if selected_side != "All":
-            filtered_trades = [t for t in filtered_trades if t.get('side') == selected_side]
+            mask &= trades_df['side'] == selected_side
         if selected_status != "All":
-            filtered_trades = [t for t in filtered_trades if t.get('status') == selected_status]
+            mask &= statuses == selected_status
         
-        # Apply limit
+        # Most recent first, then apply the limit
+        filtered_df = trades_df[mask].sort_values('trade_time', ascending=False, na_position='last')
         if selected_limit != "All":
-            filtered_trades = filtered_trades[:selected_limit]
-        
-        # Sort by most recent
-        filtered_trades.sort(key=lambda x: x.get('trade_time', ''), reverse=True)
+            filtered_df = filtered_df.head(selected_limit)
         
         # Display summary
-        st.markdown(f"### {exchange_name} Trades ({len(filtered_trades)} shown)")
+        st.markdown(f"### {exchange_name} Trades ({len(filtered_df)} shown)")
         
-        if filtered_trades:
+        if not filtered_df.empty:
             # Quick stats
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                buy_orders = len([t for t in filtered_trades if t.get('side') == 'BUY'])
-                st.metric("Buy Orders", buy_orders)
+                st.metric("Buy Orders", int((filtered_df['side'] == 'BUY').sum()))
             
             with col2:
-                sell_orders = len([t for t in filtered_trades if t.get('side') == 'SELL'])
-                st.metric("Sell Orders", sell_orders)
+                st.metric("Sell Orders", int((filtered_df['side'] == 'SELL').sum()))
             
             with col3:
-                successful = len([t for t in filtered_trades if t.get('status') in ['FILLED', 'MIRRORED']])
-                st.metric("Successful", successful)
+                st.metric("Successful", int(filtered_df['status'].isin(_OK_STATUSES).sum()))
             
             with col4:
-                total_volume = sum([float(t.get('quantity', 0)) for t in filtered_trades])
+                total_volume = pd.to_numeric(filtered_df['quantity'], errors='coerce').fillna(0).sum()
                 st.metric("Total Volume", f"{total_volume:.4f}")
             
             st.markdown("---")
             
             # Display trades
-            for i, trade in enumerate(filtered_trades):
-                with st.container():
-                    # Determine number of columns based on what we need to show
-                    num_cols = 7
-                    if show_account_column:
-                        num_cols += 1
-                    if show_exchange_column:
-                        num_cols += 1
-                    
-                    cols = st.columns(num_cols)
-                    col_idx = 0
-                    
-                    # Symbol
-                    with cols[col_idx]:
-                        symbol = trade.get('symbol', 'N/A')
-                        st.write(f"*{i}-{symbol}*")
-                        # order_id = trade.get('order_id', 'N/A')
-                        # if len(str(order_id)) > 15:
-                        #     st.caption(f"ID: {str(order_id)[:12]}...")
-                        # else:
-                        #     st.caption(f"ID: {order_id}")
-                    col_idx += 1
-                    
-                    # Side
-                    with cols[col_idx]:
-                        side = trade.get('side', 'N/A')
-                        st.write(f"{side}")
-                    col_idx += 1
-                                        
-                    # Quantity
-                    with cols[col_idx]:
-                        quantity = trade.get('quantity', 0)
-                        st.write(f"q={quantity}")
-                    col_idx += 1
-                    
-                    # Price
-                    with cols[col_idx]:
-                        price = trade.get('price')
-                        if price and float(price) > 0:
-                            st.write(f"p = ${float(price):,.4f}")
-                        else:
-                            st.write("Market")
-                    col_idx += 1
-                    
-                    # Status
-                    with cols[col_idx]:
-                        pnl = trade.get('pnl', '0')
-                        #round to 2 decimal places
-                        if not pnl or pnl == 'None':
-                            pnl = 0
-                        pnl = round(float(pnl), 3)
-                        st.write(f"PNL={pnl}")
-                    col_idx += 1
-                    
-                    # Time
-                    with cols[col_idx]:
-                        trade_time = trade.get('trade_time', 'N/A')
-                        formatted_time = safe_datetime_to_string(trade_time)
-                        if formatted_time != 'N/A' and len(formatted_time) >= 10:
-                            try:
-                                date_part = formatted_time[5:10].replace('-', '/')
-                                time_part = formatted_time[11:16] if len(formatted_time) > 11 else ""
-                                short_display = f"{date_part} {time_part}".strip()
-                                st.write(f" {short_display}")
-                            except:
-                                st.write(f"{formatted_time}")
-                        else:
-                            st.write(" N/A")
-                    col_idx += 1
-                    
-                    # Account (if showing)
-                    if show_account_column:
-                        with cols[col_idx]:
-                            account_name = trade.get('account_name', 'Unknown')
-                            if len(account_name) > 15:
-                                st.caption(f"{account_name[:12]}...")
-                            else:
-                                st.caption(f"{account_name}")
-                        col_idx += 1
-                    
-                    # Exchange (if showing)
-                    if show_exchange_column:
-                        with cols[col_idx]:
-                            exchange = trade.get('exchange', 'Unknown')
-                            exchange_icons = {'Binance': '🔶', 'Phemex': '🔴'}
-                            icon = exchange_icons.get(exchange, '🔗')
-                            st.caption(f"{icon} {exchange}")
-                    with cols[col_idx]:
-                        start_balance = round(float(trade.get('start_balance', 0)  if trade.get('start_balance', 0) != None else 0), 3)
-                        end_balance = round(float(trade.get('end_balance', 0) if trade.get('end_balance', 0) != None else 0), 3)
-
-                        st.write(f"{start_balance} -> {end_balance}$")
-                        col_idx += 1
-
-                    if i < len(filtered_trades) - 1:  # Don't add divider after last item
-                        st.divider()
+            price = pd.to_numeric(filtered_df['price'], errors='coerce')
+            start_balance = pd.to_numeric(filtered_df['start_balance'], errors='coerce').fillna(0).round(3)
+            end_balance = pd.to_numeric(filtered_df['end_balance'], errors='coerce').fillna(0).round(3)
+            table = pd.DataFrame({
+                'Symbol': filtered_df['symbol'].fillna('N/A'),
+                'Side': filtered_df['side'].fillna('N/A'),
+                'Quantity': pd.to_numeric(filtered_df['quantity'], errors='coerce'),
+                'Price': price.map('${:,.4f}'.format).where(price > 0, 'Market'),
+                'PnL': pd.to_numeric(filtered_df['pnl'], errors='coerce').fillna(0).round(3),
+                'Time': pd.to_datetime(filtered_df['trade_time'], errors='coerce'),
+            })
+            if show_account_column:
+                table['Account'] = filtered_df['account_name'].fillna('Unknown')
+            if show_exchange_column:
+                exchange = filtered_df['exchange'].fillna('Unknown').astype(str)
+                table['Exchange'] = exchange.str.lower().map(_EXCHANGE_ICONS).fillna('🔗') + ' ' + exchange
+            table['Balance'] = start_balance.astype(str) + ' -> ' + end_balance.astype(str) + '$'
+            
+            st.dataframe(
+                table,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    'Time': st.column_config.DatetimeColumn("Time", format="MM/DD HH:mm"),
+                }
+            )
         else:
             st.info("📝 No trades match the selected filters.")
 
@@ -1753,6 +1887,7 @@ def main():
     """Main application entry point"""
     # Initialize session
     SessionManager.initialize_session()
+    SessionManager.show_flash()
     
     # Sidebar
     with st.sidebar: